@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Fonctions de calcul partagées par les pages de l'application.
+
+Les modules de ce paquet n'importent jamais streamlit : ils peuvent être
+utilisés hors de l'application (scripts, traitements en lot).
+
+Le paquet lui-même n'importe ni NumPy ni pandas : importer un module léger
+(profiling, export) ne charge pas les bibliothèques de calcul.
+"""
+
+import os
+from pathlib import Path
+
+# Répertoire des fichiers convertis et du journal de diagnostic (modifiable
+# par variable d'environnement)
+CACHE_DIR = Path(os.environ.get("ACOUSTICS_CACHE_DIR", Path.home() / ".cache" / "acoustics"))
+
+# Archive des stations (voir acoustics.archive) : des données, pas un cache,
+# jamais supprimées par l'éviction du cache sur disque
+ARCHIVE_DIR = Path(os.environ.get("ACOUSTICS_ARCHIVE_DIR", Path.home() / "acoustics-archive"))
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Point d'entrée : python -m acoustics ..."""
+
+from acoustics.cli import main
+
+main()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Archive des mesures des stations, partitionnée par station et par jour.
+
+Une station enregistre toute l'année : une année de mesures à la seconde ne
+tient pas en mémoire dans un DataFrame. L'archive range les mesures dans un
+fichier Parquet par station et par jour :
+
+    ARCHIVE_DIR/<station>/<AAAA-MM-JJ>.parquet
+
+Chaque fichier contient la colonne date-heure, triée, et les mesures en
+float32, écrites par groupes de ROW_GROUP_ROWS lignes. Une lecture ne touche
+que les fichiers des jours demandés (d'après leur nom), que les colonnes
+demandées et, dans les jours en bordure de la période, que les groupes de
+lignes dont les dates la recoupent (statistiques Parquet). Les minimums et
+maximums des colonnes sont lus dans ces mêmes statistiques, sans lire les
+mesures.
+
+Les calculs sur une période (voir acoustics.query) parcourent les jours un
+par un : la mémoire utilisée est celle d'un jour, quelle que soit la
+longueur de la période.
+
+Alimentation hors de l'application :
+    python -m acoustics archiver exports/ --station STATION
+"""
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from acoustics import ARCHIVE_DIR
+from acoustics.columnar import write_columnar
+from acoustics.jobs import report
+from acoustics.loader import compact_frame
+
+TIME_COL = "Start Time"
+
+# Lignes par groupe : 6 h de mesures à la seconde. Une période qui commence
+# ou finit dans la journée ne lit que les groupes qui la recoupent.
+ROW_GROUP_ROWS = 6 * 3600
+
+_DAY = pd.Timedelta(days=1)
+
+
+def stations(root=ARCHIVE_DIR):
+    """Stations de l'archive : sous-dossiers contenant au moins un jour."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and next(p.glob("*.parquet"), None))
+
+
+def _day_of(path):
+    try:
+        return pd.Timestamp(datetime.strptime(path.stem, "%Y-%m-%d"))
+    except ValueError:
+        return None
+
+
+def _file_statistics(path):
+    """{colonne: (minimum, maximum)} d'un fichier Parquet, d'après ses statistiques."""
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    extents = {}
+    for i in range(metadata.num_row_groups):
+        group = metadata.row_group(i)
+        for j in range(group.num_columns):
+            column = group.column(j)
+            stats = column.statistics
+            # Groupe sans valeur (mesures toutes manquantes) : pas de statistiques
+            if stats is None or not stats.has_min_max:
+                continue
+            name = column.path_in_schema
+            lo, hi = extents.get(name, (stats.min, stats.max))
+            extents[name] = (min(lo, stats.min), max(hi, stats.max))
+    return extents
+
+
+def _merge_extents(extents, other):
+    for name, (lo, hi) in other.items():
+        if name in extents:
+            lo, hi = min(lo, extents[name][0]), max(hi, extents[name][1])
+        extents[name] = (lo, hi)
+    return extents
+
+
+class Station:
+    """Jours archivés d'une station : lecture par période et ajout de mesures."""
+
+    def __init__(self, name, root=ARCHIVE_DIR, time_col=TIME_COL):
+        self.name = name
+        self.directory = Path(root) / name
+        self.time_col = time_col
+
+    def __repr__(self):
+        return f"Station({self.name!r}, {str(self.directory.parent)!r})"
+
+    def path(self, day):
+        return self.directory / f"{pd.Timestamp(day):%Y-%m-%d}.parquet"
+
+    def days(self, start=None, end=None):
+        """Jours archivés (dates à minuit) qui recoupent la période [start, end]."""
+        days = sorted(d for d in map(_day_of, self.directory.glob("*.parquet")) if d is not None)
+        if start is not None:
+            days = [d for d in days if d + _DAY > pd.Timestamp(start)]
+        if end is not None:
+            days = [d for d in days if d <= pd.Timestamp(end)]
+        return days
+
+    def digest(self):
+        """
+        Empreinte du contenu archivé (jours, dates et tailles des fichiers) :
+        elle change à chaque ajout de mesures, ce qui invalide les résultats
+        mis en cache pour la station.
+        """
+        listing = []
+        for day in self.days():
+            stat = self.path(day).stat()
+            listing.append(f"{day:%Y-%m-%d}:{stat.st_mtime_ns}:{stat.st_size}")
+        text = "\n".join([str(self.directory), *listing])
+        return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+    def columns(self):
+        """Colonnes de mesures archivées (celles du jour le plus récent)."""
+        import pyarrow.parquet as pq
+
+        days = self.days()
+        if not days:
+            return []
+        return [c for c in pq.read_schema(self.path(days[-1])).names if c != self.time_col]
+
+    def span(self):
+        """Première et dernière date-heure archivées (statistiques des fichiers), ou None."""
+        days = self.days()
+        if not days:
+            return None
+        first = _file_statistics(self.path(days[0])).get(self.time_col)
+        last = _file_statistics(self.path(days[-1])).get(self.time_col)
+        if first is None or last is None:
+            return None
+        return pd.Timestamp(first[0]), pd.Timestamp(last[1])
+
+    def read_day(self, day, start=None, end=None, columns=None):
+        """
+        Mesures d'un jour entre start et end, sous forme compacte (voir
+        compact_frame). Seuls les groupes de lignes qui recoupent la période
+        et les colonnes `columns` sont lus ; une colonne absente de ce jour
+        est remplie de NaN.
+        """
+        import pyarrow.parquet as pq
+
+        path = self.path(day)
+        names = pq.read_schema(path).names
+        wanted = [c for c in (names if columns is None else columns) if c != self.time_col]
+        filters = []
+        if start is not None and pd.Timestamp(start) > pd.Timestamp(day):
+            filters.append((self.time_col, ">=", pd.Timestamp(start)))
+        if end is not None and pd.Timestamp(end) < pd.Timestamp(day) + _DAY:
+            filters.append((self.time_col, "<=", pd.Timestamp(end)))
+        table = pq.read_table(path, columns=[self.time_col] + [c for c in wanted if c in names],
+                              filters=filters or None)
+        # Les jours sont écrits triés et typés par append() : le tableau
+        # compact est construit directement, sans reconversion des colonnes
+        data = {name: table.column(name).to_numpy() if name in names
+                else np.full(table.num_rows, np.nan, dtype=np.float32) for name in wanted}
+        index = pd.DatetimeIndex(table.column(self.time_col).to_numpy(), name=self.time_col)
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def scan(self, start=None, end=None, columns=None):
+        """
+        Mesures de la période [start, end], jour par jour (un tableau compact
+        par jour archivé). L'avancement est signalé avec report() à chaque
+        jour, pour un parcours exécuté comme travail d'arrière-plan.
+        """
+        days = self.days(start, end)
+        for i, day in enumerate(days):
+            report(i / len(days), f"{day:%Y-%m-%d}")
+            frame = self.read_day(day, start, end, columns)
+            if len(frame):
+                yield frame
+
+    def extents(self, columns=None, start=None, end=None):
+        """
+        {colonne: (minimum, maximum)} sur la période [start, end].
+
+        Les jours entièrement compris dans la période ne sont pas lus : leurs
+        extrêmes viennent des statistiques Parquet. Seuls les jours en
+        bordure sont lus, pour les colonnes demandées.
+        """
+        extents = {}
+        for day in self.days(start, end):
+            inside = ((start is None or pd.Timestamp(start) <= day)
+                      and (end is None or day + _DAY <= pd.Timestamp(end)))
+            if inside:
+                stats = _file_statistics(self.path(day))
+            else:
+                frame = self.read_day(day, start, end, columns)
+                stats = {name: (float(col.min()), float(col.max())) for name, col in frame.items() if col.notna().any()}
+            stats.pop(self.time_col, None)
+            _merge_extents(extents, {k: v for k, v in stats.items() if columns is None or k in columns})
+        # + 0.0 : un zéro négatif des statistiques devient 0.0
+        return {name: (float(lo) + 0.0, float(hi) + 0.0) for name, (lo, hi) in extents.items()}
+
+    def append(self, df):
+        """
+        Ajoute les mesures de `df` (colonne date-heure et mesures) aux jours
+        correspondants et retourne la liste des jours écrits.
+
+        Les colonnes non numériques (texte) ne sont pas archivées. Là où les
+        mesures ajoutées recoupent celles d'un jour déjà archivé, les mesures
+        archivées sont gardées : archiver deux fois le même export ne change
+        rien.
+        """
+        keep = [c for c in df.columns if c == self.time_col or (pd.api.types.is_numeric_dtype(df[c])
+                                                                 and not pd.api.types.is_bool_dtype(df[c]))]
+        frame = compact_frame(df[keep], self.time_col)
+        if not len(frame):
+            return []
+        days = frame.index.normalize()
+        bounds = np.flatnonzero(np.r_[True, days[1:] != days[:-1], True])
+        written = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            day = days[lo]
+            part = frame.iloc[lo:hi]
+            path = self.path(day)
+            if path.exists():
+                part = pd.concat([self.read_day(day), part])
+                part = part[~part.index.duplicated(keep="first")].sort_index(kind="stable")
+            write_columnar(part.astype(np.float32).reset_index(), path, row_group_size=ROW_GROUP_ROWS)
+            written.append(day)
+        return written
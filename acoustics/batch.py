@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Calcul en lot des niveaux Ljour, Lsoir, Lnuit et Lden par jour et par station.
+
+Chaque fichier est traité dans un processus séparé ; les sommes d'énergie
+par jour et par période sont ensuite regroupées par station, de sorte
+qu'une même journée répartie sur plusieurs fichiers donne un seul résultat.
+Les mesures en double de fichiers qui se chevauchent ne sont comptées
+qu'une fois (même règle que acoustics.loader.merge_measurements).
+
+Utilisation hors de l'application :
+    python -m acoustics lot dossier_des_stations -o lden_par_jour.csv
+"""
+
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from acoustics.columnar import read_file
+from acoustics.jobs import parallel_map
+from acoustics.lden import PERIOD_OF_HOUR, combine_periods
+
+# Colonnes lues par défaut ; à défaut, les deux premières colonnes du fichier
+TIME_COL = "Start Time"
+LAEQ_COL = "LAeq"
+
+EXTENSIONS = (".xlsx", ".csv")
+LEVEL_COLUMNS = ["Ljour", "Lsoir", "Lnuit"]
+
+
+def read_levels(source, name, time_col=TIME_COL, laeq_col=LAEQ_COL):
+    """Lit les colonnes date-heure et LAeq d'un fichier (chemin ou octets)."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    header = read_file(source, name, nrows=0).columns
+    if time_col in header and laeq_col in header:
+        usecols = [time_col, laeq_col]
+    else:
+        usecols = list(header[:2])
+    if hasattr(source, "seek"):
+        source.seek(0)
+    df = read_file(source, name, usecols=usecols)
+    return df[usecols].set_axis(["time", "laeq"], axis=1)
+
+
+def period_energy(times, laeq):
+    """
+    Somme des énergies et nombre de mesures par jour civil et par période.
+
+    Les périodes sont celles du calcul Lden (jour 7h-19h, soir 19h-23h,
+    nuit 23h-7h), déterminées par l'heure de chaque mesure. La nuit d'une
+    date regroupe donc les mesures de 0h à 7h et de 23h à minuit.
+    """
+    times = pd.Series(times)
+    # Dates déjà typées (archive, tableau compact) : pas de reconversion
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, errors="coerce")
+    laeq = pd.to_numeric(pd.Series(laeq), errors="coerce").to_numpy(dtype=float)
+    valid = times.notna().to_numpy() & ~np.isnan(laeq)
+    times = times[valid]
+    laeq = laeq[valid]
+    work = pd.DataFrame({
+        "Date": times.dt.normalize().to_numpy(),
+        "period": PERIOD_OF_HOUR[times.dt.hour.to_numpy()],
+        "energy": 10 ** (laeq / 10),
+    })
+    return work.groupby(["Date", "period"])["energy"].agg(energy="sum", count="size")
+
+
+def daily_table(energy):
+    """Niveaux par période et Lden, à partir des sommes d'énergie par (…, Date, période)."""
+    keys = list(energy.index.names[:-1])
+    sums = energy.groupby(keys + ["period"]).sum()
+    with np.errstate(divide="ignore"):
+        levels = 10 * np.log10(sums["energy"] / sums["count"])
+    table = (levels.unstack("period")
+             .reindex(columns=range(3))
+             .fillna(-np.inf)
+             .set_axis(LEVEL_COLUMNS, axis=1))
+    table["Lden"] = combine_periods(table["Ljour"], table["Lsoir"], table["Lnuit"])
+    table["Nb mesures"] = sums["count"].groupby(keys).sum()
+    return table.reset_index()
+
+
+def station_name(path, root=None):
+    """
+    Station d'un fichier : son sous-dossier dans `root`, sinon le début de son
+    nom jusqu'au premier « _ » (« STATION_2025-06-01.xlsx » → « STATION »).
+    """
+    path = Path(path)
+    if root is not None and path.parent != Path(root):
+        return path.parent.name
+    return path.stem.split("_")[0]
+
+
+def _file_energy(station, name, source, time_col, laeq_col, after=None):
+    # Sommes d'énergie du fichier (mesures postérieures à `after` si précisé)
+    # et première et dernière dates-heures lues
+    df = read_levels(source, name, time_col=time_col, laeq_col=laeq_col)
+    times = pd.to_datetime(df["time"], errors="coerce")
+    laeq = df["laeq"]
+    if after is not None:
+        keep = (times > after).to_numpy()
+        times, laeq = times[keep], laeq[keep]
+    energy = period_energy(times, laeq)
+    return pd.concat({station: energy}, names=["Station"]), (times.min(), times.max())
+
+
+def _overlaps(files, spans):
+    """
+    {indice du fichier: date-heure à partir de laquelle garder ses mesures}
+    pour les fichiers qui chevauchent un fichier de la même station.
+
+    Comme dans merge_measurements, les fichiers d'une station sont pris dans
+    l'ordre de leur première date : là où deux fichiers se chevauchent, les
+    mesures du fichier qui commence le plus tôt sont gardées.
+    """
+    cutoffs = {}
+    by_station = {}
+    for i, (station, _, _) in enumerate(files):
+        if not pd.isna(spans[i][0]):
+            by_station.setdefault(station, []).append(i)
+    for indices in by_station.values():
+        end = None
+        for i in sorted(indices, key=lambda i: spans[i][0]):
+            first, last = spans[i]
+            if end is not None and first <= end:
+                cutoffs[i] = end
+            end = last if end is None else max(end, last)
+    return cutoffs
+
+
+def batch_lden(files, workers=None, time_col=TIME_COL, laeq_col=LAEQ_COL):
+    """
+    Tableau consolidé des niveaux par station et par jour.
+
+    `files` est une liste de triplets (station, nom du fichier, source), la
+    source étant un chemin ou le contenu du fichier en octets. Les fichiers
+    sont lus en parallèle par `workers` processus (tous les cœurs par défaut).
+
+    Les fichiers d'une station qui en chevauchent un autre sont relus sans
+    les mesures déjà comptées ; le nombre de mesures en double ignorées par
+    station est dans `attrs["mesures en double"]`.
+    """
+    files = list(files)
+    if not files:
+        return pd.DataFrame(columns=["Station", "Date"] + LEVEL_COLUMNS + ["Lden", "Nb mesures"])
+    args = [(station, name, source, time_col, laeq_col) for station, name, source in files]
+    results = parallel_map(_file_energy, args, workers=workers)
+    parts = [energy for energy, _ in results]
+
+    duplicates = {}
+    cutoffs = _overlaps(files, [span for _, span in results])
+    if cutoffs:
+        # Seuls les fichiers qui se chevauchent sont relus
+        redo = list(cutoffs)
+        again = parallel_map(_file_energy, [args[i] + (cutoffs[i],) for i in redo], workers=workers)
+        for i, (energy, _) in zip(redo, again):
+            station = files[i][0]
+            duplicates[station] = duplicates.get(station, 0) + int(parts[i]["count"].sum() - energy["count"].sum())
+            parts[i] = energy
+
+    table = daily_table(pd.concat(parts))
+    table["Date"] = table["Date"].dt.date
+    table = table.sort_values(["Station", "Date"], ignore_index=True)
+    table.attrs["mesures en double"] = duplicates
+    return table
+
+
+def find_files(root):
+    """Fichiers de mesures d'un dossier et de ses sous-dossiers."""
+    root = Path(root)
+    return sorted(p for p in root.rglob("*") if p.suffix.lower() in EXTENSIONS and p.is_file())
+
+
+def batch_lden_dir(root, workers=None, **kwargs):
+    """Niveaux par station et par jour pour tous les fichiers d'un dossier."""
+    files = [(station_name(p, root), p.name, p) for p in find_files(root)]
+    return batch_lden(files, workers=workers, **kwargs)
+
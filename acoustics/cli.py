@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Ligne de commande pour les traitements hors de l'application.
+
+    python -m acoustics lden mesures.xlsx
+    python -m acoustics lot dossier_des_stations -o lden_par_jour.csv
+    python -m acoustics vent dossier -d resultats/
+    python -m acoustics niveaux mesures.xlsx --intervalle 15min
+    python -m acoustics rose mesures.xlsx --image rose.png
+    python -m acoustics convertir dossier -d parquet/
+    python -m acoustics archiver exports/ --station STATION
+
+Les fichiers peuvent être donnés un par un ou par dossier (parcouru avec ses
+sous-dossiers). Les modules de calcul ne sont importés que par la commande
+qui s'en sert, et matplotlib seulement si une image est demandée.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def expand_paths(paths):
+    """Fichiers désignés par `paths`, les dossiers étant remplacés par leur contenu."""
+    from acoustics.batch import find_files
+
+    files = []
+    for path in paths:
+        files.extend(find_files(path) if path.is_dir() else [path])
+    return files
+
+
+def _output_path(directory, src, suffix):
+    directory = Path(directory) if directory is not None else src.parent
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{src.stem}{suffix}"
+
+
+def cmd_lden(args):
+    import pandas as pd
+
+    from acoustics.lden import lden_streaming
+
+    rows = []
+    for path in expand_paths(args.fichiers):
+        res = lden_streaming(path, chunksize=args.chunksize)
+        rows.append({"Fichier": path.name, **{k: float(v) for k, v in res.items()}})
+    table = pd.DataFrame(rows, columns=["Fichier", "Ljour", "Lsoir", "Lnuit", "Lden"])
+    if args.sortie:
+        table.to_csv(args.sortie, index=False)
+    else:
+        print(table.to_string(index=False, float_format="%.2f"))
+
+
+def cmd_lot(args):
+    from acoustics.batch import batch_lden_dir
+
+    table = batch_lden_dir(args.dossier, workers=args.workers, time_col=args.col_temps, laeq_col=args.col_laeq)
+    if args.sortie:
+        table.to_csv(args.sortie, index=False)
+    else:
+        print(table.to_string(index=False, float_format="%.2f"))
+    for station, n in table.attrs.get("mesures en double", {}).items():
+        print(f"{station} : {n} mesure(s) en double entre fichiers qui se chevauchent, comptée(s) une fois",
+              file=sys.stderr)
+
+
+def cmd_vent(args):
+    from acoustics.columnar import read_file
+    from acoustics.wind import compute_wind_vectors
+
+    columns = ["Start Time", "Wind Speed avg", "Wind Dir. avg"]
+    for path in expand_paths(args.fichiers):
+        df = read_file(path, usecols=columns)
+        vectors = compute_wind_vectors(df, freq=args.pas)
+        dst = _output_path(args.dossier_sortie, path, "_vent.csv")
+        vectors.to_csv(dst, index=False)
+        print(f"{path.name}: {len(vectors)} intervalles -> {dst}")
+
+
+def cmd_niveaux(args):
+    import pandas as pd
+
+    from acoustics.columnar import read_file
+    from acoustics.indicators import interval_table
+
+    for path in expand_paths(args.fichiers):
+        df = read_file(path, usecols=[args.col_temps, args.col_laeq])
+        times = pd.to_datetime(df[args.col_temps], errors="coerce")
+        laeq = df[args.col_laeq].set_axis(times)[times.notna().to_numpy()].sort_index()
+        table = interval_table(laeq, args.intervalle)
+        dst = _output_path(args.dossier_sortie, path, f"_niveaux_{args.intervalle}.csv")
+        table.to_csv(dst)
+        print(f"{path.name}: {len(table)} intervalles -> {dst}")
+
+
+def cmd_rose(args):
+    from acoustics.columnar import read_file
+    from acoustics.rose import DEFAULT_BINS, rose_table
+
+    bins = tuple(float(b) for b in args.classes.split(",")) if args.classes else DEFAULT_BINS[args.unite]
+    df = read_file(args.fichier, usecols=[args.col_direction, args.col_vitesse])
+    table = rose_table(df[args.col_direction], df[args.col_vitesse],
+                       nsector=args.secteurs, bins=bins, unit=args.unite)
+    if args.sortie:
+        table.to_csv(args.sortie)
+    else:
+        print(table.to_string(float_format="%.2f"))
+
+    if args.image:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        from acoustics.rose import plot_rose
+
+        ax = plot_rose(table, legend_title=f"Vitesse du vent\n {args.unite}")
+        ax.figure.savefig(args.image)
+
+
+def cmd_convertir(args):
+    from acoustics.columnar import convert_file
+
+    for path in expand_paths(args.fichiers):
+        dst = convert_file(path, _output_path(args.dossier_sortie, path, ".parquet"))
+        print(f"{path.name} -> {dst}")
+
+
+def cmd_archiver(args):
+    from acoustics import ARCHIVE_DIR
+    from acoustics.archive import Station
+    from acoustics.batch import station_name
+    from acoustics.columnar import read_file, to_columnar
+
+    root = args.archive or ARCHIVE_DIR
+    for path in expand_paths(args.fichiers):
+        station = Station(args.station or station_name(path), root=root, time_col=args.col_temps)
+        days = station.append(to_columnar(read_file(path)))
+        print(f"{path.name}: {len(days)} jour(s) -> {station.directory}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m acoustics", description="Traitements des mesures acoustiques et météo.")
+    sub = parser.add_subparsers(dest="commande", required=True)
+
+    p = sub.add_parser("lden", help="Ljour, Lsoir, Lnuit et Lden de chaque fichier (heure et LAeq en colonnes 1 et 2)")
+    p.add_argument("fichiers", nargs="+", type=Path, help="fichiers .xlsx/.csv ou dossiers")
+    p.add_argument("-o", "--sortie", type=Path, help="fichier CSV de résultats (sinon affichage)")
+    p.add_argument("--chunksize", type=int, default=100_000, help="nombre de lignes lues à la fois")
+    p.set_defaults(func=cmd_lden)
+
+    p = sub.add_parser("lot", help="niveaux par jour et par station pour un dossier")
+    p.add_argument("dossier", type=Path, help="dossier des fichiers (un sous-dossier par station)")
+    p.add_argument("-o", "--sortie", type=Path, help="fichier CSV de résultats (sinon affichage)")
+    p.add_argument("-j", "--workers", type=int, default=None, help="nombre de processus (défaut : tous les cœurs)")
+    p.add_argument("--col-temps", default="Start Time", help="colonne date-heure")
+    p.add_argument("--col-laeq", default="LAeq", help="colonne LAeq")
+    p.set_defaults(func=cmd_lot)
+
+    p = sub.add_parser("vent", help="vitesse, direction moyenne et sigma thêta par intervalle")
+    p.add_argument("fichiers", nargs="+", type=Path, help="fichiers .xlsx/.csv ou dossiers")
+    p.add_argument("--pas", default="5Min", help="largeur des intervalles (défaut : 5Min)")
+    p.add_argument("-d", "--dossier-sortie", type=Path, help="dossier des CSV produits (défaut : à côté des fichiers)")
+    p.set_defaults(func=cmd_vent)
+
+    p = sub.add_parser("niveaux", help="Leq, L10, L50 et L90 par intervalle")
+    p.add_argument("fichiers", nargs="+", type=Path, help="fichiers .xlsx/.csv ou dossiers")
+    p.add_argument("--intervalle", default="1h", help="largeur des intervalles (défaut : 1h)")
+    p.add_argument("--col-temps", default="Start Time", help="colonne date-heure")
+    p.add_argument("--col-laeq", default="LAeq", help="colonne LAeq")
+    p.add_argument("-d", "--dossier-sortie", type=Path, help="dossier des CSV produits (défaut : à côté des fichiers)")
+    p.set_defaults(func=cmd_niveaux)
+
+    p = sub.add_parser("rose", help="table de fréquences de la rose des vents")
+    p.add_argument("fichier", type=Path, help="fichier .xlsx/.csv")
+    p.add_argument("--secteurs", type=int, default=16, help="nombre de secteurs de direction")
+    p.add_argument("--unite", choices=["m/s", "km/h"], default="m/s", help="unité des classes de vitesse")
+    p.add_argument("--classes", help="bornes des classes de vitesse, séparées par des virgules")
+    p.add_argument("--col-direction", default="Wind Dir. avg", help="colonne de direction")
+    p.add_argument("--col-vitesse", default="Wind Speed avg", help="colonne de vitesse (m/s)")
+    p.add_argument("-o", "--sortie", type=Path, help="fichier CSV de la table (sinon affichage)")
+    p.add_argument("--image", type=Path, help="image du graphique (.png, .svg, .pdf)")
+    p.set_defaults(func=cmd_rose)
+
+    p = sub.add_parser("convertir", help="conversion des exports en Parquet typé")
+    p.add_argument("fichiers", nargs="+", type=Path, help="fichiers .xlsx/.csv ou dossiers")
+    p.add_argument("-d", "--dossier-sortie", type=Path, help="dossier des fichiers Parquet (défaut : à côté des fichiers)")
+    p.set_defaults(func=cmd_convertir)
+
+    p = sub.add_parser("archiver", help="ajout des exports à l'archive des stations (un fichier par jour)")
+    p.add_argument("fichiers", nargs="+", type=Path, help="fichiers .xlsx/.csv ou dossiers")
+    p.add_argument("--station", help="station des mesures (défaut : déduite du nom de chaque fichier)")
+    p.add_argument("--archive", type=Path, help="dossier de l'archive (défaut : ACOUSTICS_ARCHIVE_DIR)")
+    p.add_argument("--col-temps", default="Start Time", help="colonne date-heure")
+    p.set_defaults(func=cmd_archiver)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion des exports de sonomètre en fichiers Parquet typés.
+
+La lecture d'un classeur par openpyxl est de loin l'étape la plus lente de
+l'application. Un classeur n'est donc parsé qu'une fois : son contenu est
+converti en Parquet (colonnes datetime et float32) et les chargements
+suivants du même fichier ne lisent que les colonnes dont la page a besoin.
+"""
+
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from acoustics import CACHE_DIR
+
+# Colonnes utilisées par la page Multi-Trace
+MULTITRACE_COLUMNS = [
+    "Start Time",
+    "LAeq",
+    "Wind Speed avg",
+    "Wind Dir. avg",
+    "Amb. Humidity",
+    "Amb. Temperature",
+]
+
+
+def read_file(source, name=None, **read_kwargs):
+    """
+    Lit un fichier CSV ou Excel selon son extension.
+
+    `source` est un chemin, un fichier ouvert ou le contenu du fichier en
+    octets ; `name` donne l'extension quand `source` n'a pas de nom.
+    """
+    if name is None:
+        name = str(getattr(source, "name", source))
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if name.lower().endswith(".csv"):
+        return pd.read_csv(source, **read_kwargs)
+    return pd.read_excel(source, **read_kwargs)
+
+
+def to_columnar(df):
+    """
+    Retourne une copie typée de `df` : nombres en float32, dates en datetime64.
+
+    Les colonnes texte de types mélangés sont converties en chaînes pour que
+    le tableau puisse être écrit en Parquet.
+    """
+    out = {}
+    for name, col in df.items():
+        if pd.api.types.is_bool_dtype(col) or pd.api.types.is_datetime64_any_dtype(col):
+            out[name] = col
+        elif pd.api.types.is_numeric_dtype(col):
+            out[name] = col.astype(np.float32)
+        else:
+            kind = pd.api.types.infer_dtype(col, skipna=True)
+            if kind in ("integer", "floating", "mixed-integer-float", "empty"):
+                out[name] = pd.to_numeric(col, errors="coerce").astype(np.float32)
+            elif kind in ("datetime", "datetime64"):
+                out[name] = pd.to_datetime(col, errors="coerce")
+            elif kind.startswith("mixed"):
+                out[name] = col.astype("string")
+            else:
+                out[name] = col
+    # Les noms de colonnes doivent être des chaînes en Parquet
+    return pd.DataFrame(out).rename(columns=str)
+
+
+def columnar_path(key):
+    return CACHE_DIR / f"{key}.parquet"
+
+
+def write_columnar(df, path, **parquet_kwargs):
+    """
+    Écrit `df` en Parquet ; le fichier n'apparaît qu'une fois complet.
+
+    `parquet_kwargs` est transmis à DataFrame.to_parquet (row_group_size...).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False, **parquet_kwargs)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read_columnar(path, columns=None, nrows=None):
+    """
+    Lit un fichier Parquet, en se limitant à `columns` et aux `nrows`
+    premières lignes si précisé (seul le premier lot de lignes est décodé).
+    """
+    if nrows is None:
+        return pd.read_parquet(path, columns=columns)
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    batch = next(parquet.iter_batches(batch_size=max(nrows, 1), columns=columns), None)
+    if batch is None:
+        return pd.read_parquet(path, columns=columns)
+    return batch.to_pandas().iloc[:nrows]
+
+
+def convert_file(src, dst=None, **read_kwargs):
+    """
+    Convertit un export Excel/CSV en Parquet typé et retourne le chemin écrit.
+
+    Par défaut, le fichier Parquet est placé à côté du fichier d'origine.
+    """
+    src = Path(src)
+    df = read_file(src, **read_kwargs)
+    dst = Path(dst) if dst is not None else src.with_suffix(".parquet")
+    write_columnar(to_columnar(df), dst)
+    return dst
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Arithmétique des niveaux en décibels sur des tableaux entiers.
+
+Somme, différence, moyenne énergétique et Leq pondéré, vectorisés avec
+NumPy. Les sommes sont calculées relativement au niveau maximal
+(formulation « log-sum-exp ») : 10^(L/10) n'est jamais formé pour le niveau
+brut, si bien qu'aucun dépassement n'est possible quel que soit le niveau et
+que la précision ne dépend pas de l'écart entre les niveaux combinés.
+
+Les valeurs NaN sont ignorées ; une combinaison sans aucune valeur donne
+-inf (absence d'énergie), comme un niveau de -inf.
+"""
+
+import sys
+
+import numpy as np
+
+_DB = 10 / np.log(10)
+
+
+def _as_levels(levels):
+    return np.asarray(levels, dtype=float)
+
+
+def _wrap(result, levels, axis):
+    # Une colonne de résultat par colonne de DataFrame. pandas n'est pas
+    # importé ici : s'il n'est pas déjà chargé, `levels` n'est pas un DataFrame
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(levels, pd.DataFrame) and axis == 0:
+        return pd.Series(result, index=levels.columns)
+    return result[()] if isinstance(result, np.ndarray) and result.ndim == 0 else result
+
+
+def _log_sum(levels, weights, axis):
+    """10·log10(Σ w·10^(L/10)) le long de `axis`, calculé par rapport au maximum."""
+    finite = np.isfinite(levels)
+    with np.errstate(invalid="ignore"):
+        top = np.max(np.where(finite, levels, -np.inf), axis=axis, keepdims=True, initial=-np.inf)
+    shift = np.where(np.isfinite(top), top, 0.0)
+    with np.errstate(invalid="ignore"):
+        terms = np.where(finite, weights * np.exp((levels - shift) / _DB), 0.0)
+    total = np.sum(terms, axis=axis, keepdims=True)
+    with np.errstate(divide="ignore"):
+        result = np.where(total > 0, shift + _DB * np.log(total), -np.inf)
+    return np.squeeze(result, axis=axis) if axis is not None else result.reshape(())
+
+
+def db_sum(levels, axis=None):
+    """Somme énergétique : 10·log10(Σ 10^(L/10))."""
+    values = _as_levels(levels)
+    return _wrap(_log_sum(values, 1.0, axis), levels, axis)
+
+
+def db_mean(levels, axis=None):
+    """Moyenne énergétique (Leq de mesures de même durée) : 10·log10(Σ 10^(L/10) / n)."""
+    values = _as_levels(levels)
+    count = np.sum(~np.isnan(values), axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = _log_sum(values, 1.0, axis) - _DB * np.log(count)
+    return _wrap(np.where(count > 0, result, -np.inf), levels, axis)
+
+
+def leq(levels, weights=None, axis=None):
+    """
+    Leq pondéré : 10·log10(Σ w·10^(L/10) / Σ w).
+
+    `weights` (durées, par exemple) est diffusé contre `levels` ; sans
+    pondération, le résultat est celui de db_mean. Un niveau dont le poids
+    manque (NaN) ou n'est pas fini est ignoré, comme un niveau NaN.
+    """
+    if weights is None:
+        return db_mean(levels, axis=axis)
+    values = _as_levels(levels)
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), values.shape)
+    valid = ~np.isnan(values) & np.isfinite(weights)
+    values = np.where(valid, values, np.nan)
+    weight_sum = np.sum(np.where(valid, weights, 0.0), axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = _log_sum(values, np.where(valid, weights, 0.0), axis) - _DB * np.log(weight_sum)
+    return _wrap(np.where(weight_sum > 0, result, -np.inf), levels, axis)
+
+
+def db_difference(total, level):
+    """
+    Soustraction énergétique : 10·log10(10^(total/10) - 10^(level/10)).
+
+    Niveau restant une fois `level` (bruit de fond, par exemple) retiré de
+    `total`, élément par élément. Donne -inf si les niveaux sont égaux et
+    NaN si `level` dépasse `total`.
+    """
+    total = np.asarray(total, dtype=float)
+    level = np.asarray(level, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.exp((level - total) / _DB)
+        result = total + _DB * np.log1p(-ratio)
+    result = np.where(level == -np.inf, total, result)
+    return result[()] if result.ndim == 0 else result
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de résultats sur disque, partagé par les sessions et conservé après
+un redémarrage.
+
+Les résultats coûteux (vecteurs de vent, niveaux Lden, images) sont écrits
+dans CACHE_DIR sous un nom dérivé de l'empreinte du fichier et des
+paramètres du calcul : un second utilisateur qui ouvre un fichier déjà
+traité les relit au lieu de les recalculer. Les caches en mémoire des pages
+restent le premier niveau ; le disque n'est lu qu'en cas d'absence.
+
+Accès concurrents : chaque fichier est écrit sous un nom temporaire puis
+renommé, si bien qu'un lecteur ne voit jamais un fichier incomplet ; un
+fichier disparu (supprimé par un autre processus) ou illisible est traité
+comme absent. La taille du répertoire est bornée : au-delà de MAX_BYTES, les
+fichiers les moins récemment utilisés (résultats, conversions Parquet de
+acoustics.columnar et tableaux projetés de acoustics.mapped) sont supprimés.
+
+Le répertoire n'est parcouru qu'au premier ajout et quand un ajout fait
+dépasser la limite : entre-temps, chaque fichier écrit est ajouté à un total
+tenu par le processus. Les fichiers écrits par d'autres processus n'y sont
+comptés qu'au parcours suivant.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from acoustics import CACHE_DIR
+
+# Taille maximale du répertoire (modifiable par variable d'environnement, en Mo)
+MAX_BYTES = int(os.environ.get("ACOUSTICS_CACHE_MAX_MB", 2048)) * 1024**2
+
+# Fichiers (et répertoires de tableaux projetés) comptés et supprimés par l'éviction
+PATTERNS = ("*.pkl", "*.parquet", "*.cols")
+
+_MISSING = object()
+
+
+class DiskCache:
+    """Résultats sérialisés dans un répertoire, bornés en taille totale."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Taille du répertoire d'après le dernier parcours et les ajouts depuis (None : pas encore parcouru)
+        self._size = None
+
+    def path(self, namespace, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.directory / f"{namespace}-{digest}.pkl"
+
+    def get(self, namespace, key, default=None):
+        path = self.path(namespace, key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # Fichier illisible (version de bibliothèque différente...) : recalculé
+            self._remove(path)
+            return default
+        self.touch(path)
+        return value
+
+    def put(self, namespace, key, value):
+        """Écrit `value` ; une erreur d'écriture n'empêche jamais le calcul d'aboutir."""
+        path = self.path(namespace, key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        except Exception:
+            return
+        self.added(path)
+
+    def cached(self, namespace, key, fn, *args, **kwargs):
+        """Résultat de fn(*args, **kwargs), lu sur le disque s'il y est déjà."""
+        value = self.get(namespace, key, _MISSING)
+        if value is _MISSING:
+            value = fn(*args, **kwargs)
+            self.put(namespace, key, value)
+        return value
+
+    def touch(self, path):
+        """Marque un fichier comme utilisé (l'éviction supprime les plus anciens)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _size_of(self, path):
+        if path.is_dir():
+            return sum(f.stat().st_size for f in path.iterdir())
+        return path.stat().st_size
+
+    def _files(self):
+        files = []
+        for pattern in PATTERNS:
+            for path in self.directory.glob(pattern):
+                try:
+                    stat = path.stat()
+                    size = self._size_of(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, size, path))
+        return files
+
+    def _remove(self, path):
+        # Un tableau projeté encore ouvert reste lisible par ceux qui l'utilisent
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def added(self, path):
+        """
+        Compte un fichier (ou un répertoire de tableau projeté) qui vient
+        d'être écrit dans le répertoire ; l'éviction n'a lieu que si le total
+        dépasse alors max_bytes.
+        """
+        try:
+            size = self._size_of(Path(path))
+        except OSError:
+            size = 0
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+                if self._size <= self.max_bytes:
+                    return
+            self._trim()
+
+    def trim(self):
+        """Supprime les fichiers les moins récemment utilisés au-delà de max_bytes."""
+        with self._lock:
+            self._trim()
+
+    def _trim(self):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    def stats(self):
+        files = self._files()
+        return {"files": len(files), "bytes": sum(size for _, size, _ in files)}
+
+
+# Cache partagé par les pages et les traitements
+store = DiskCache()
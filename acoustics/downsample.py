@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Réduction du nombre de points d'une série avant son tracé (méthode M4).
+
+Une figure de 18 pouces de large ne compte que quelques milliers de colonnes
+de pixels : tracer des millions de mesures ne fait que ralentir le rendu et
+l'encodage PNG. La série est découpée en intervalles de même largeur en x ;
+pour chacun, on garde le premier et le dernier point ainsi que le minimum
+et le maximum. Le tracé obtenu est identique à l'œil, pics de bruit compris.
+"""
+
+import numpy as np
+
+
+def m4_indices(x, y, n_buckets, x_range=None):
+    """
+    Indices (triés) des points à conserver pour tracer `y` en fonction de `x`.
+
+    `x` est croissant (par exemple des dates en int64). Les valeurs NaN qui
+    marquent une interruption de la série sont conservées (une par
+    intervalle) pour que le tracé reste interrompu.
+
+    Les intervalles découpent `x_range` (premier et dernier x par défaut) :
+    une série lue par morceaux est réduite morceau par morceau avec les
+    intervalles de la série entière.
+    """
+    x = np.asarray(x)
+    # Colonnes float32 (tableaux compacts, projetés) lues sans conversion ni copie
+    y = np.asarray(y)
+    if y.dtype.kind != "f":
+        y = y.astype(float)
+    n = len(x)
+    # Une série entière de peu de points est tracée telle quelle. Un morceau
+    # (x_range donné) est toujours réduit : même court, il peut tomber dans
+    # quelques intervalles seulement, et la série entière serait réduite
+    if n_buckets < 1 or (x_range is None and n <= 4 * n_buckets):
+        return np.arange(n)
+
+    # Numéro d'intervalle de chaque point ; x étant trié, les intervalles se suivent
+    x0, x1 = (x[0], x[-1]) if x_range is None else x_range
+    span = float(x1 - x0) or 1.0
+    bucket = np.clip(((x - x0) / span * n_buckets).astype(np.int64), 0, n_buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    # Minimum et maximum de chaque intervalle (en ignorant les NaN), puis
+    # premier point de l'intervalle qui atteint chacune de ces valeurs
+    with np.errstate(invalid="ignore"):
+        lo = np.fmin.reduceat(y, starts)
+        hi = np.fmax.reduceat(y, starts)
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    keep = [starts, ends]
+    for extreme in (lo, hi):
+        hits = np.flatnonzero(y == extreme[group])
+        keep.append(hits[np.unique(group[hits], return_index=True)[1]])
+    nans = np.flatnonzero(np.isnan(y))
+    keep.append(nans[np.unique(group[nans], return_index=True)[1]])
+    return np.unique(np.concatenate(keep))
+
+
+def points_for_width(width_px, points_per_px=2):
+    """Nombre d'intervalles M4 pour environ `points_per_px` points par colonne de pixels."""
+    # M4 garde jusqu'à 4 points par intervalle
+    return max(1, int(width_px * points_per_px / 4))
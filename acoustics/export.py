@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Export des figures matplotlib à la demande (PNG, SVG ou PDF).
+
+L'encodage d'une grande figure en PNG coûte à peu près autant que son
+rendu : il n'est fait que lorsqu'un téléchargement est demandé, et l'image
+obtenue est gardée en cache selon les paramètres du graphique.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+# Format proposé -> (extension, type MIME)
+FORMATS = {
+    "PNG": ("png", "image/png"),
+    "SVG (vectoriel)": ("svg", "image/svg+xml"),
+    "PDF (vectoriel)": ("pdf", "application/pdf"),
+}
+
+MAX_ENTRIES = 16
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def encode_figure(fig, fmt="PNG", transparent=False):
+    """Encode `fig` dans le format demandé (clé de FORMATS) et retourne les octets."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=FORMATS[fmt][0], transparent=transparent)
+    return buffer.getvalue()
+
+
+def cached_export(fig, key, fmt="PNG", transparent=False):
+    """
+    Octets de l'image de `fig`, encodée une seule fois par (key, format, fond).
+
+    `key` décrit tout ce qui détermine le contenu du graphique (fichier,
+    période, options, échelles, titre...) ; deux figures de même clé sont
+    supposées identiques. `fig` peut aussi être une fonction sans argument
+    qui construit la figure : elle n'est appelée que si l'image n'est pas
+    déjà en cache.
+    """
+    entry = (key, fmt, transparent)
+    with _lock:
+        if entry in _cache:
+            _cache.move_to_end(entry)
+            return _cache[entry]
+    if callable(fig):
+        fig = fig()
+    data = encode_figure(fig, fmt, transparent)
+    with _lock:
+        _cache[entry] = data
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return data
+
+
+def deferred_export(fig, key, fmt="PNG", transparent=False):
+    """
+    Fonction sans argument qui retourne l'image encodée.
+
+    À passer comme `data` de st.download_button : l'encodage n'a lieu qu'au
+    clic sur le bouton.
+    """
+    return lambda: cached_export(fig, key, fmt, transparent)
+
+
+def export_file_name(stem, fmt):
+    """Nom de fichier avec l'extension du format."""
+    return f"{stem}.{FORMATS[fmt][0]}"
+
+
+def export_mime(fmt):
+    return FORMATS[fmt][1]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Indicateurs calculés sur la colonne LAeq : Leq glissant et niveaux
+statistiques (L10, L50, L90) par intervalle fixe.
+
+Le Leq glissant est obtenu par différence de sommes cumulées des énergies :
+chaque point coûte une soustraction, quelle que soit la largeur de la
+fenêtre. Les niveaux statistiques sont lus dans un histogramme des niveaux
+par intervalle (pas de 0,1 dB, la résolution des exports), que l'on peut
+remplir morceau par morceau : la mémoire ne dépend que du nombre
+d'intervalles et de l'étendue des niveaux, pas du nombre de mesures.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Résolution (dB) de l'histogramme des niveaux
+RESOLUTION = 0.1
+
+# Niveaux dépassés pendant 10 %, 50 % et 90 % du temps
+PERCENTILES = (10, 50, 90)
+
+_DB = 10 / np.log(10)
+
+
+def rolling_leq(laeq, window="1h"):
+    """
+    Leq glissant sur `window` (par exemple "15min", "1h") de chaque mesure.
+
+    `laeq` est une série indexée par des dates triées ; le Leq de chaque
+    point couvre les mesures de l'intervalle ]t - window, t]. Les mesures
+    NaN sont ignorées ; un point sans mesure dans sa fenêtre vaut NaN.
+    """
+    times = laeq.index.to_numpy()
+    values = laeq.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+
+    # Énergies relatives au niveau maximal : les sommes cumulées restent
+    # d'un ordre de grandeur raisonnable, même sur des mois de mesures
+    top = np.max(values[valid]) if valid.any() else 0.0
+    energy = np.where(valid, np.exp((values - top) / _DB), 0.0)
+    cum_energy = np.concatenate(([0.0], np.cumsum(energy)))
+    cum_count = np.concatenate(([0], np.cumsum(valid)))
+
+    start = np.searchsorted(times, times - pd.Timedelta(window).to_timedelta64(), side="right")
+    end = np.arange(1, len(times) + 1)
+    count = cum_count[end] - cum_count[start]
+    # Une différence légèrement négative peut venir des arrondis
+    window_energy = np.maximum(cum_energy[end] - cum_energy[start], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leq = np.where(count > 0, top + _DB * np.log(window_energy / count), np.nan)
+    return pd.Series(leq, index=laeq.index, name=f"Leq,{window}")
+
+
+class LevelHistogram:
+    """
+    Histogramme des niveaux par intervalle, rempli morceau par morceau.
+
+    Les intervalles sont repérés par un numéro entier ; les niveaux sont
+    arrondis à RESOLUTION.
+    """
+
+    def __init__(self, resolution=RESOLUTION):
+        self.resolution = resolution
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.offset = 0
+
+    def add(self, intervals, levels):
+        levels = np.asarray(levels, dtype=float)
+        intervals = np.asarray(intervals, dtype=np.int64)
+        valid = ~np.isnan(levels)
+        bins = np.rint(levels[valid] / self.resolution).astype(np.int64)
+        intervals = intervals[valid]
+        if not len(bins):
+            return
+        self._grow(intervals.max() + 1, bins.min(), bins.max())
+        nbins = self.counts.shape[1]
+        flat = intervals * nbins + (bins - self.offset)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def _grow(self, n_intervals, lo, hi):
+        rows, cols = self.counts.shape
+        if cols:
+            lo, hi = min(lo, self.offset), max(hi, self.offset + cols - 1)
+        counts = np.zeros((max(rows, n_intervals), hi - lo + 1), dtype=np.int64)
+        if cols:
+            counts[:rows, self.offset - lo:self.offset - lo + cols] = self.counts
+        self.counts, self.offset = counts, lo
+
+    def exceeded(self, percent):
+        """Niveau dépassé pendant `percent` % des mesures de chaque intervalle (NaN si vide)."""
+        total = self.counts.sum(axis=1)
+        # Nombre de mesures inférieures ou égales au niveau cherché
+        target = total * (1 - percent / 100)
+        cumulative = np.cumsum(self.counts, axis=1)
+        index = np.argmax(cumulative >= np.maximum(target, 1)[:, None], axis=1)
+        # Arrondi : 404 * 0.1 donnerait 40.400000000000006
+        levels = np.round((index + self.offset) * self.resolution, 6)
+        return np.where(total > 0, levels, np.nan)
+
+
+def interval_table(laeq, freq="1h", percentiles=PERCENTILES):
+    """
+    Leq, niveaux statistiques et nombre de mesures par intervalle de `freq`.
+
+    `laeq` est une série indexée par des dates triées. Les intervalles sans
+    aucune ligne ne figurent pas dans le tableau ; ceux dont toutes les
+    mesures sont NaN ont des niveaux NaN.
+    """
+    starts = laeq.index.floor(freq)
+    labels, intervals = np.unique(starts.to_numpy(), return_inverse=True)
+    values = laeq.to_numpy(dtype=float)
+
+    table = pd.DataFrame(index=pd.DatetimeIndex(labels, name="Début"))
+    table["Leq"] = _interval_leq(intervals, values, len(labels))
+
+    histogram = LevelHistogram()
+    histogram.add(intervals, values)
+    for p in percentiles:
+        table[f"L{p}"] = histogram.exceeded(p)
+    table["Nb mesures"] = np.bincount(intervals, weights=~np.isnan(values), minlength=len(labels)).astype(np.int64)
+    return table
+
+
+def _interval_leq(intervals, values, n):
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.full(n, np.nan)
+    top = values[valid].max()
+    energy = np.bincount(intervals[valid], weights=np.exp((values[valid] - top) / _DB), minlength=n)
+    count = np.bincount(intervals[valid], minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, top + _DB * np.log(energy / count), np.nan)
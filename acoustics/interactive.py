@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Graphique Multi-Trace interactif (Vega-Lite, via Altair).
+
+Les séries, déjà réduites, sont envoyées une fois au navigateur : le
+déplacement et le zoom se font ensuite côté client, sans relancer le script.
+La disposition reprend celle de la figure matplotlib : LAeq à gauche, vent,
+%HR et température sur des axes décalés à droite, flèches de direction du
+vent en haut du graphique.
+"""
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from acoustics.multitrace import MAX_ARROWS
+from acoustics.wind import thin_vectors
+
+# Mêmes couleurs que le cycle matplotlib
+COLORS = {"C0": "#1f77b4", "C1": "#ff7f0e", "C2": "#2ca02c", "C3": "#d62728", "C4": "#9467bd",
+          "C5": "#8c564b", "C7": "#7f7f7f", "C8": "#bcbd22"}
+
+HEIGHT = 550
+
+# Direction du vent : nombre maximal d'étiquettes (la largeur du graphique
+# n'étant connue que du navigateur, environ une par demi-pouce d'un écran
+# large). Le nombre de flèches est limité comme dans la figure matplotlib.
+MAX_LABELS = 40
+
+
+def _line(data, title, color, domain, orient="left", offset=0):
+    return alt.Chart(data).mark_line(color=COLORS[color], strokeWidth=1).encode(
+        x=alt.X("time:T", title=None, axis=alt.Axis(format="%Y-%m-%d %H:%M:%S", labelAngle=-55)),
+        y=alt.Y("value:Q", title=title, scale=alt.Scale(domain=list(domain)),
+                axis=alt.Axis(orient=orient, offset=offset, titleColor=COLORS[color])),
+        tooltip=[alt.Tooltip("time:T", title="Date-heure", format="%Y-%m-%d %H:%M:%S"),
+                 alt.Tooltip("value:Q", title=title, format=".1f")],
+    )
+
+
+def series_frame(times, values):
+    """Tableau (time, value) d'une série, au format attendu par multitrace_chart."""
+    return pd.DataFrame({"time": np.asarray(times), "value": np.asarray(values, dtype=float)})
+
+
+def multitrace_chart(laeq, others, title, x_domain, vectors=None, arrow_y=None, labels=False, overlays=(),
+                     max_arrows=MAX_ARROWS, max_labels=MAX_LABELS):
+    """
+    Construit le graphique interactif.
+
+    `laeq` et chaque élément de `others` sont des dictionnaires
+    {"data": series_frame(...), "title": ..., "color": "C0", "domain": (min, max)} ;
+    les séries de `others` ont chacune leur axe à droite. `vectors` est le
+    tableau de compute_wind_vectors : au plus `max_arrows` de ses flèches
+    (voir thin_vectors) sont placées à la hauteur `arrow_y` de l'axe LAeq,
+    avec au plus `max_labels` étiquettes de direction si `labels`.
+    `overlays` sont des séries en dB (Leq glissant, L10...) tracées sur
+    l'axe LAeq : {"data": ..., "title": ..., "color": ..., "step": bool}.
+    """
+    zoom = alt.selection_interval(bind="scales", encodings=["x", "y"])
+    x_scale = alt.Scale(domain=[pd.Timestamp(x_domain[0]).isoformat(), pd.Timestamp(x_domain[1]).isoformat()])
+
+    main = _line(laeq["data"], laeq["title"], laeq["color"], laeq["domain"]).encode(
+        x=alt.X("time:T", title=None, scale=x_scale,
+                axis=alt.Axis(format="%Y-%m-%d %H:%M:%S", labelAngle=-55)),
+    ).add_params(zoom)
+    primary = [main]
+
+    for overlay in overlays:
+        # Même champ et même échelle que la trace LAeq
+        primary.append(alt.Chart(overlay["data"]).mark_line(
+            color=COLORS[overlay["color"]], strokeWidth=1.5,
+            interpolate="step-after" if overlay.get("step") else "linear",
+        ).encode(
+            x=alt.X("time:T"), y=alt.Y("value:Q"),
+            tooltip=[alt.Tooltip("time:T", title="Date-heure", format="%Y-%m-%d %H:%M:%S"),
+                     alt.Tooltip("value:Q", title=overlay["title"], format=".1f")],
+        ))
+
+    if vectors is not None and len(vectors):
+        # Comme dans la figure matplotlib : un intervalle sur plusieurs
+        # au-delà de max_arrows, étiquettes sous une partie des flèches
+        vectors, _ = thin_vectors(vectors, max_arrows)
+        arrows = pd.DataFrame({
+            "time": vectors["Start Time"],
+            "value": arrow_y,
+            # Flèche « arrow » orientée vers le haut à 0°, rotation horaire :
+            # même orientation que le quiver (cos θ, -sin θ) de la figure
+            "angle": (vectors["MeanWindDirection"] + 90) % 360,
+            "direction": vectors["MeanWindDirection"] + 270,
+            "sigma": vectors["SigmaTheta"],
+        }).dropna(subset=["angle"])
+        # Même champ et même échelle que la trace LAeq : l'axe de gauche est partagé
+        base = alt.Chart(arrows).encode(x=alt.X("time:T"), y=alt.Y("value:Q"))
+        primary.append(base.mark_point(shape="arrow", filled=True, color="black", size=120).encode(
+            angle=alt.Angle("angle:Q", scale=None),
+            tooltip=[alt.Tooltip("time:T", title="Début", format="%Y-%m-%d %H:%M"),
+                     alt.Tooltip("direction:Q", title="Direction (°)", format=".1f"),
+                     alt.Tooltip("sigma:Q", title="Sigma thêta (°)", format=".1f")],
+        ))
+        if labels:
+            labelled, _ = thin_vectors(arrows, max_labels)
+            primary.append(alt.Chart(labelled).encode(x=alt.X("time:T"), y=alt.Y("value:Q")).mark_text(color="red", fontSize=8, dy=22, lineBreak="\n").transform_calculate(
+                label="format(datum.direction, '.1f') + '\\n(' + format(datum.sigma, '.1f') + ')'"
+            ).encode(text="label:N"))
+
+    layers = [alt.layer(*primary)]
+    for i, trace in enumerate(others):
+        layers.append(_line(trace["data"], trace["title"], trace["color"], trace["domain"],
+                            orient="right", offset=50 * i))
+
+    return alt.layer(*layers).resolve_scale(y="independent").properties(
+        title=title, height=HEIGHT, width="container"
+    )
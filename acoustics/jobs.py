@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+File de travaux exécutés en arrière-plan, dans le processus.
+
+Les calculs longs (lecture d'un gros classeur, calcul en lot, rendu d'une
+figure) sont confiés à un groupe de fils d'exécution : le fil du script
+streamlit ne fait qu'afficher leur avancement et reste libre de réagir aux
+widgets. Chaque travail est identifié par une clé construite à partir de
+ses entrées :
+
+- un travail déjà terminé avec la même clé est réutilisé tel quel ;
+- un travail en cours avec la même clé est partagé au lieu d'être relancé ;
+- un travail dont plus personne n'attend le résultat (les entrées ont
+  changé) est annulé : avant son démarrage s'il est encore en file, sinon au
+  prochain appel de report().
+
+Les fonctions exécutées signalent leur avancement avec report(), qui ne fait
+rien hors d'un travail. L'annulation est coopérative : un calcul sans appel
+à report() va jusqu'au bout, et son résultat reste disponible.
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# Nombre de travaux exécutés simultanément et de résultats conservés
+WORKERS = 4
+MAX_FINISHED = 32
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """Levée par report() dans un travail annulé."""
+
+
+class Job:
+    """Travail soumis à la file : avancement, annulation et résultat."""
+
+    def __init__(self, key):
+        self.key = key
+        self.fraction = 0.0
+        self.message = ""
+        self.holders = 0
+        self.future = None
+        self._cancel = threading.Event()
+
+    def report(self, fraction, message=""):
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+        if self._cancel.is_set():
+            raise Cancelled(self.key)
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    def failed(self):
+        return self.future.done() and (self.future.cancelled() or self.future.exception() is not None)
+
+    def wait(self, timeout=None):
+        """Attend la fin du travail au plus `timeout` secondes ; retourne True s'il est terminé."""
+        try:
+            self.future.exception(timeout=timeout)
+        except TimeoutError:
+            return False
+        except BaseException:
+            pass
+        return True
+
+    def result(self):
+        return self.future.result()
+
+
+class JobQueue:
+    """Groupe de fils d'exécution et travaux indexés par clé."""
+
+    def __init__(self, workers=WORKERS, max_finished=MAX_FINISHED):
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="travail")
+        self._jobs = OrderedDict()  # clé -> Job
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Travail de clé `key`, soumis si nécessaire : fn(*args, **kwargs).
+
+        L'appelant devient l'un des détenteurs du travail et doit appeler
+        release() quand il n'attend plus son résultat.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.failed() or (job.cancelled and not job.done()):
+                job = Job(key)
+                job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+                self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            job.holders += 1
+            self._trim()
+            return job
+
+    def release(self, job):
+        """Le détenteur n'attend plus le résultat ; sans autre détenteur, le travail est annulé."""
+        with self._lock:
+            job.holders -= 1
+            if job.holders <= 0 and not job.done():
+                job.cancel()
+
+    def _trim(self):
+        finished = [k for k, j in self._jobs.items() if j.done()]
+        for key in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[key]
+
+    @staticmethod
+    def _run(job, fn, args, kwargs):
+        _local.job = job
+        try:
+            job.report(0.0)
+            result = fn(*args, **kwargs)
+            job.fraction = 1.0
+            return result
+        finally:
+            _local.job = None
+
+
+def report(fraction, message=""):
+    """
+    Avancement (0 à 1) du travail en cours dans ce fil ; lève Cancelled si
+    le travail a été annulé. Hors d'un travail, ne fait rien.
+    """
+    job = getattr(_local, "job", None)
+    if job is not None:
+        job.report(fraction, message)
+
+
+def parallel_map(fn, args, workers=None):
+    """
+    [fn(*a) for a in args], calculé par `workers` processus (tous les cœurs
+    par défaut) ; l'avancement est signalé avec report() à chaque élément.
+
+    Si le travail est annulé ou qu'un élément échoue, les éléments pas encore
+    commencés sont abandonnés.
+
+    Les processus sont démarrés par « spawn » et non par fork : un fork fait
+    depuis un fil d'arrière-plan copierait les verrous tenus à ce moment par
+    les autres fils (cache sur disque, file de travaux) et le processus
+    enfant pourrait s'y bloquer. `fn` doit donc être une fonction de module.
+    """
+    args = list(args)
+    workers = min(workers or os.cpu_count() or 1, len(args))
+    results = [None] * len(args)
+    if workers <= 1:
+        for i, a in enumerate(args):
+            report(i / len(args), f"{i}/{len(args)}")
+            results[i] = fn(*a)
+        return results
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(fn, *a): i for i, a in enumerate(args)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                report(done / len(args), f"{done}/{len(args)}")
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return results
+
+
+# File partagée par toutes les sessions de l'application
+queue = JobQueue()
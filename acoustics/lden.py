@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Calcul de l'indice Lden par accumulation des énergies par période.
+
+Seules les sommes d'énergie et les nombres de mesures de chaque période
+(jour, soir, nuit) sont conservés : le fichier peut être lu par morceaux et
+la mémoire utilisée ne dépend pas de la durée de l'enregistrement.
+
+Utilisation hors de l'application :
+    python -m acoustics lden mesures.xlsx
+"""
+
+
+import numpy as np
+import pandas as pd
+
+from acoustics.decibels import leq
+from acoustics.jobs import report
+
+# Périodes : Jour 7h à 19h, Soir 19h à 23h, Nuit 23h à 7h
+DAY, EVENING, NIGHT = 0, 1, 2
+PERIOD_OF_HOUR = np.array([NIGHT] * 7 + [DAY] * 12 + [EVENING] * 4 + [NIGHT])
+
+# Durée (h) et pénalité (dB) de chaque période dans la moyenne sur 24h
+PERIOD_HOURS = np.array([12, 4, 8])
+PERIOD_PENALTY = np.array([0, 5, 10])
+
+CHUNKSIZE = 100_000
+
+
+def hours_of(values):
+    """
+    Heure (0-23) de chaque valeur de la colonne horaire.
+
+    Accepte des chaînes hh:mm:ss ou date-heure (« 2025-06-01 00:00:00 »,
+    export CSV d'un sonomètre), ainsi que les heures et dates-heures telles
+    que lues dans les cellules Excel.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.hour.to_numpy()
+    if pd.api.types.infer_dtype(values, skipna=True) in ("time", "datetime"):
+        return values.map(lambda v: v.hour).to_numpy()
+    try:
+        return pd.to_datetime(values, format="%H:%M:%S").dt.hour.to_numpy()
+    except ValueError:
+        return pd.to_datetime(values, format="mixed").dt.hour.to_numpy()
+
+
+def combine_periods(l_day, l_evening, l_night):
+    """
+    Lden : moyenne énergétique pondérée des niveaux de jour, soir et nuit.
+
+    Les niveaux peuvent être des tableaux (un Lden par élément). Retourne
+    -inf si aucune période ne contient de mesure.
+    """
+    levels = np.array(np.broadcast_arrays(l_day, l_evening, l_night), dtype=float)
+    shape = (3,) + (1,) * (levels.ndim - 1)
+    return leq(levels + PERIOD_PENALTY.reshape(shape), weights=PERIOD_HOURS.reshape(shape), axis=0)
+
+
+class LdenAccumulator:
+    """Sommes d'énergie et nombres de mesures par période, mises à jour par morceaux."""
+
+    def __init__(self):
+        self.energy = np.zeros(3)
+        self.count = np.zeros(3, dtype=np.int64)
+
+    def add(self, hours, laeq):
+        laeq = np.asarray(laeq, dtype=float)
+        hours = np.asarray(hours, dtype=float)
+        # Les mesures sans heure ou sans niveau sont ignorées
+        valid = ~(np.isnan(laeq) | np.isnan(hours))
+        codes = PERIOD_OF_HOUR[hours[valid].astype(np.int64)]
+        self.energy += np.bincount(codes, weights=10 ** (laeq[valid] / 10), minlength=3)
+        self.count += np.bincount(codes, minlength=3)
+
+    def levels(self):
+        """Niveaux LAeq moyens (jour, soir, nuit) ; -inf pour une période vide."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.count > 0, 10 * np.log10(self.energy / self.count), -np.inf)
+
+    def result(self):
+        l_day, l_evening, l_night = self.levels()
+        return {
+            "Ljour": l_day,
+            "Lsoir": l_evening,
+            "Lnuit": l_night,
+            "Lden": combine_periods(l_day, l_evening, l_night),
+        }
+
+
+def lden_from_frame(df, hour_col="Heure", laeq_col="LAeq"):
+    """Lden d'un tableau déjà chargé en mémoire."""
+    acc = LdenAccumulator()
+    acc.add(hours_of(df[hour_col]), df[laeq_col])
+    return acc.result()
+
+
+def _read_chunks(source, name, chunksize):
+    # (morceau, nombre total de lignes du fichier ou None s'il n'est pas connu d'avance)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    if name.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(source)
+        total = parquet.metadata.num_rows
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=parquet.schema_arrow.names[:2]):
+            yield batch.to_pandas().set_axis(["Heure", "LAeq"], axis=1), total
+        return
+    if name.lower().endswith(".csv"):
+        for chunk in pd.read_csv(source, usecols=[0, 1], chunksize=chunksize):
+            yield chunk.set_axis(["Heure", "LAeq"], axis=1), None
+        return
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        # Dimension déclarée par le classeur, absente de certains exports
+        total = sheet.max_row - 1 if sheet.max_row else None
+        rows = []
+        for row in sheet.iter_rows(min_row=2, max_col=2, values_only=True):
+            rows.append(row)
+            if len(rows) == chunksize:
+                yield pd.DataFrame(rows, columns=["Heure", "LAeq"]), total
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows, columns=["Heure", "LAeq"]), total
+    finally:
+        workbook.close()
+
+
+def iter_chunks(source, name=None, chunksize=CHUNKSIZE):
+    """
+    Lit les deux premières colonnes (heure, LAeq) de `source` par morceaux.
+
+    `source` est un chemin ou un fichier ouvert (par exemple un fichier
+    téléversé). Les fichiers CSV sont lus par pandas, les conversions
+    Parquet (voir acoustics.columnar) par lots de lignes, les classeurs
+    Excel ligne par ligne par openpyxl en mode lecture seule. La première
+    ligne contient les en-têtes.
+
+    L'avancement est signalé avec report() à chaque morceau : exécutée comme
+    travail d'arrière-plan, la lecture d'un travail annulé s'arrête au
+    morceau suivant.
+    """
+    if name is None:
+        name = str(getattr(source, "name", source))
+    done = 0
+    for chunk, total in _read_chunks(source, name, chunksize):
+        done += len(chunk)
+        report(min(done / total, 1.0) if total else 0.0, f"{done} lignes")
+        yield chunk
+
+
+def lden_streaming(source, name=None, chunksize=CHUNKSIZE):
+    """Lden d'un fichier lu par morceaux, sans le charger en entier."""
+    acc = LdenAccumulator()
+    for chunk in iter_chunks(source, name=name, chunksize=chunksize):
+        chunk = chunk.dropna(how="all")
+        acc.add(hours_of(chunk["Heure"]), pd.to_numeric(chunk["LAeq"]))
+    return acc.result()
+
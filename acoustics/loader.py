@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture des fichiers Excel/CSV téléversés, avec cache en mémoire.
+
+Chaque rerun de Streamlit relit le script en entier : sans cache, le même
+classeur est reparsé par openpyxl à chaque clic. Les fichiers sont identifiés
+par l'empreinte de leur contenu et le DataFrame lu est conservé dans un cache
+LRU borné en nombre d'entrées et en mémoire, partagé par toutes les pages.
+
+Le contenu parsé est aussi converti en Parquet (voir acoustics.columnar) :
+après un redémarrage, ou quand une page ne demande que quelques colonnes,
+le classeur n'a pas à être relu par openpyxl. Ces fichiers comptent dans la
+taille bornée du cache sur disque (voir acoustics.diskcache).
+
+Pour les séries de mesures, load_measurements retourne un tableau compact
+(colonnes utiles en float32, index de dates trié) partagé sans copie ;
+load_campaign fusionne de la même façon les exports successifs d'une
+campagne, lus en parallèle dans des processus séparés. Ces tableaux sont
+conservés une colonne par fichier NumPy et rouverts par projection en
+mémoire (voir acoustics.mapped) : après un redémarrage, ils se rouvrent sans
+lecture ni conversion, et les processus qui les ouvrent partagent les mêmes
+pages en mémoire.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from acoustics.columnar import columnar_path, read_columnar, read_file, to_columnar, write_columnar
+from acoustics.diskcache import store
+from acoustics.jobs import parallel_map
+from acoustics.mapped import load_frame, mapped_bytes, mapped_path, save_frame
+
+# Limites par défaut du cache
+MAX_ENTRIES = 8
+MAX_BYTES = 1024**3  # 1 Go
+
+# Écart entre deux fichiers, en pas de mesure, au-delà duquel les tracés
+# d'une campagne fusionnée sont interrompus
+GAP_FACTOR = 3
+
+
+class DataFrameCache:
+    """Cache LRU de DataFrames, borné en nombre d'entrées et en octets."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clé -> (DataFrame, taille en octets)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        # Les colonnes projetées depuis le disque (voir acoustics.mapped) ne
+        # comptent pas : elles sont dans le cache de pages du système
+        size = int(df.memory_usage(index=True, deep=True).sum()) - mapped_bytes(df)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            # Un tableau plus gros que le plafond n'est pas conservé
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def discard(self, predicate):
+        """Retire les entrées dont la clé vérifie `predicate`."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_cache = DataFrameCache()
+
+# Empreintes déjà calculées, par identifiant de fichier téléversé
+_digests = OrderedDict()
+_MAX_DIGESTS = 64
+
+
+def _read_bytes(uploaded_file):
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+
+def file_digest(uploaded_file):
+    """Empreinte du contenu d'un fichier téléversé (calculée une seule fois)."""
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is not None and file_id in _digests:
+        return _digests[file_id]
+    digest = hashlib.blake2b(_read_bytes(uploaded_file), digest_size=20).hexdigest()
+    if file_id is not None:
+        _digests[file_id] = digest
+        if len(_digests) > _MAX_DIGESTS:
+            _digests.popitem(last=False)
+    return digest
+
+
+def _columnar_key(digest, name, read_kwargs):
+    options = repr((name.lower().rsplit(".", 1)[-1], sorted(read_kwargs.items())))
+    return digest + "-" + hashlib.blake2b(options.encode(), digest_size=6).hexdigest()
+
+
+def _load_columnar(name, source, digest, columns, read_kwargs, nrows=None):
+    """
+    Lit la version Parquet du fichier, en la créant au premier passage.
+
+    `source` est le fichier téléversé ou son contenu en octets. Avec `nrows`
+    (aperçu), seules les premières lignes sont lues : dans la conversion si
+    elle existe, sinon dans le fichier d'origine, qui n'est alors ni parsé en
+    entier ni converti.
+    """
+    path = columnar_path(_columnar_key(digest, name, read_kwargs))
+    if path.exists():
+        try:
+            df = read_columnar(path, columns, nrows=nrows)
+            store.touch(path)
+            return df
+        except Exception:
+            # Fichier converti illisible : on reparse le fichier d'origine
+            pass
+    data = source if isinstance(source, bytes) else _read_bytes(source)
+    if nrows is not None:
+        df = to_columnar(read_file(data, name, nrows=nrows, **read_kwargs))
+        return df if columns is None else df[list(columns)]
+    df = to_columnar(read_file(data, name, **read_kwargs))
+    try:
+        write_columnar(df, path)
+        # Les conversions comptent dans la taille bornée du cache sur disque
+        store.added(path)
+    except Exception:
+        # Répertoire non inscriptible ou type non pris en charge par Parquet :
+        # le tableau reste utilisable, il sera simplement reparsé la fois suivante
+        pass
+    return df if columns is None else df[list(columns)]
+
+
+def _parse_options(read_kwargs):
+    """
+    Options de lecture qui changent le contenu du fichier converti, et nombre
+    de lignes demandé. Le moteur et l'en-tête par défaut ne changent rien :
+    quelles que soient les options des pages, le fichier n'est converti
+    qu'une fois. Un aperçu (`nrows`) n'est lu que sur ses premières lignes.
+    """
+    options = {k: v for k, v in read_kwargs.items() if k != "engine" and not (k == "header" and v == 0)}
+    return options, options.pop("nrows", None)
+
+
+def _copy_on_write():
+    # Toujours active à partir de pandas 3, optionnelle avant
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def load_table(uploaded_file, columns=None, **read_kwargs):
+    """
+    Retourne le contenu d'un fichier téléversé sous forme de DataFrame.
+
+    Le fichier n'est parsé qu'à la première demande ; les appels suivants avec
+    le même contenu et les mêmes options de lecture reçoivent une copie du
+    tableau en cache, que la page peut modifier librement : avec la copie à
+    l'écriture de pandas, la copie est superficielle et seules les colonnes
+    modifiées sont copiées ; sans elle (pandas < 3), la copie est complète.
+    `columns` limite la lecture aux colonnes utiles à la page.
+    """
+    digest = file_digest(uploaded_file)
+    key = (digest, uploaded_file.name.lower().rsplit(".", 1)[-1],
+           repr(sorted(read_kwargs.items())), None if columns is None else tuple(columns))
+    df = _cache.get(key)
+    if df is None:
+        options, nrows = _parse_options(read_kwargs)
+        df = _load_columnar(uploaded_file.name, uploaded_file, digest, columns, options, nrows=nrows)
+        _cache.put(key, df)
+    return df.copy(deep=not _copy_on_write())
+
+
+def columnar_file(uploaded_file, **read_kwargs):
+    """Chemin de la conversion Parquet d'un fichier téléversé, ou None s'il n'a pas encore été converti."""
+    options, _ = _parse_options(read_kwargs)
+    path = columnar_path(_columnar_key(file_digest(uploaded_file), uploaded_file.name, options))
+    return path if path.exists() else None
+
+
+def compact_frame(df, time_col="Start Time"):
+    """
+    Tableau compact des mesures de `df` : colonnes en float32, indexées par
+    `time_col` converti en dates et trié. Les lignes sans date valide sont
+    retirées.
+
+    Les colonnes sont construites directement dans l'ordre des dates, sans
+    les copies intermédiaires de dropna, set_index et sort_index.
+    """
+    times = pd.to_datetime(df[time_col], errors="coerce").to_numpy()
+    valid = ~np.isnat(times)
+    # Cas courant (export complet, déjà trié) : aucune sélection de lignes
+    rows = slice(None) if valid.all() else np.flatnonzero(valid)
+    if not (np.diff(times[rows]) >= np.timedelta64(0)).all():
+        rows = np.flatnonzero(valid)[np.argsort(times[valid], kind="stable")]
+    data = {
+        name: pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float32)[rows]
+        for name, col in df.items() if name != time_col
+    }
+    return pd.DataFrame(data, index=pd.DatetimeIndex(times[rows], name=time_col), copy=False)
+
+
+def _mapped(key, build):
+    """
+    Tableau compact de clé `key`, projeté depuis sa copie sur disque (voir
+    acoustics.mapped). Au premier passage, il est construit par build(),
+    écrit, puis remplacé par sa projection : la mémoire du tableau construit
+    est libérée et les sessions partagent les pages du fichier.
+    """
+    path = mapped_path("mesures-" + hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest())
+    df = load_frame(path)
+    if df is not None:
+        store.touch(path)
+        return df
+    df = build()
+    try:
+        save_frame(df, path)
+        store.added(path)
+    except Exception:
+        # Répertoire non inscriptible : le tableau construit reste utilisable
+        return df
+    mapped = load_frame(path)
+    return df if mapped is None else mapped
+
+
+def load_measurements(uploaded_file, columns, time_col="Start Time"):
+    """
+    Retourne les colonnes `columns` d'un fichier de mesures sous forme compacte
+    (voir compact_frame), indexées par `time_col`.
+
+    Contrairement à load_table, le tableau retourné est celui du cache, sans
+    copie : il est partagé entre les pages et les sessions et ne doit pas être
+    modifié.
+    """
+    digest = file_digest(uploaded_file)
+    columns = [time_col] + [c for c in columns if c != time_col]
+    key = (digest, uploaded_file.name.lower().rsplit(".", 1)[-1], "mesures", tuple(columns))
+    df = _cache.get(key)
+    if df is None:
+        df = _mapped(key, lambda: compact_frame(_load_columnar(uploaded_file.name, uploaded_file, digest,
+                                                               columns, {}), time_col))
+        _cache.put(key, df)
+    return df
+
+
+def _measurements(name, data, digest, columns, time_col):
+    # Exécuté dans un processus de lecture : fichier en octets, tableau compact en retour
+    return compact_frame(_load_columnar(name, data, digest, columns, {}), time_col)
+
+
+def merge_measurements(frames, gap_factor=GAP_FACTOR):
+    """
+    Fusionne des tableaux compacts (voir compact_frame) en une seule série.
+
+    Les tableaux sont pris dans l'ordre de leur première date. Là où deux
+    fichiers se chevauchent, les mesures du fichier qui commence le plus tôt
+    sont gardées et celles de l'autre, ignorées. Entre deux fichiers séparés
+    de plus de `gap_factor` fois le pas de mesure, une ligne NaN est insérée
+    pour que les tracés soient interrompus plutôt que reliés par un segment.
+
+    Le tableau retourné porte dans `attrs["fusion"]` le nombre de fichiers,
+    de mesures ignorées et d'interruptions.
+    """
+    frames = sorted((f for f in frames if len(f)), key=lambda f: f.index[0])
+    parts, ignored, gaps = [], 0, 0
+    for frame in frames:
+        if parts:
+            end = parts[-1].index[-1]
+            kept = frame.iloc[frame.index.searchsorted(end, side="right"):]
+            ignored += len(frame) - len(kept)
+            frame = kept
+            if not len(frame):
+                continue
+            step = np.median(np.diff(parts[-1].index.to_numpy())) if len(parts[-1]) > 1 else None
+            if step is not None and frame.index[0] - end > gap_factor * step:
+                parts.append(pd.DataFrame(np.nan, index=pd.DatetimeIndex([end + step], name=frame.index.name),
+                                          columns=frame.columns).astype(frame.dtypes))
+                gaps += 1
+        parts.append(frame)
+    merged = pd.concat(parts) if parts else pd.DataFrame()
+    merged.attrs["fusion"] = {"fichiers": len(frames), "mesures ignorées": ignored, "interruptions": gaps}
+    return merged
+
+
+def load_campaign(uploaded_files, columns, time_col="Start Time", workers=None):
+    """
+    Fusion (voir merge_measurements) des fichiers de mesures d'une campagne,
+    sous la même forme compacte et partagée que load_measurements.
+
+    Les fichiers pas encore convertis en Parquet sont lus en parallèle par
+    `workers` processus (tous les cœurs par défaut). Exécuté comme travail
+    d'arrière-plan (voir acoustics.jobs), l'avancement est signalé à chaque
+    fichier lu.
+    """
+    uploaded_files = list(uploaded_files)
+    if len(uploaded_files) == 1:
+        return load_measurements(uploaded_files[0], columns, time_col=time_col)
+    columns = [time_col] + [c for c in columns if c != time_col]
+    digests = [file_digest(f) for f in uploaded_files]
+    key = (tuple(sorted(digests)), "campagne", tuple(columns))
+    df = _cache.get(key)
+    if df is not None:
+        return df
+
+    def build():
+        args = [(f.name, _read_bytes(f), digest, columns, time_col) for f, digest in zip(uploaded_files, digests)]
+        return merge_measurements(parallel_map(_measurements, args, workers=workers))
+
+    df = _mapped(key, build)
+    _cache.put(key, df)
+    return df
+
+
+def files_digest(uploaded_files):
+    """Empreinte d'un ensemble de fichiers, indépendante de leur ordre."""
+    digests = sorted(file_digest(f) for f in uploaded_files)
+    return digests[0] if len(digests) == 1 else hashlib.blake2b("".join(digests).encode(), digest_size=20).hexdigest()
+
+
+def footprint(df):
+    """Mémoire occupée par `df`, index compris : (octets, octets par ligne)."""
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    return size, size / len(df) if len(df) else 0.0
+
+
+def release(digest):
+    """Retire du cache les tableaux lus depuis le fichier d'empreinte `digest`."""
+    # Première partie de la clé : une empreinte, ou celles d'une campagne
+    _cache.discard(lambda key: digest in (key[0] if isinstance(key[0], tuple) else (key[0],)))
+
+
+def cache_stats():
+    """Compteurs du cache : succès, échecs, entrées et octets occupés."""
+    return _cache.stats()
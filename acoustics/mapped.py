@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Tableaux de mesures conservés sur disque en fichiers NumPy, une colonne par
+fichier, et rouverts par projection en mémoire (memory map).
+
+Un tableau compact (voir acoustics.loader.compact_frame) est écrit dans un
+répertoire de CACHE_DIR :
+
+    <clé>.cols/meta.json     en-tête : nombre de lignes, noms, types et attrs
+    <clé>.cols/index.npy     dates (datetime64)
+    <clé>.cols/c0.npy, ...   une colonne par fichier (float32)
+
+Rouvrir le tableau ne lit ni ne convertit rien : les colonnes sont des
+projections en lecture seule des fichiers, sans copie, et les pages du
+fichier sont chargées par le système à la première lecture. Toutes les
+sessions et tous les processus qui ouvrent le même tableau partagent ainsi
+une seule copie en mémoire (le cache de pages du système), et un tableau
+déjà traité se rouvre instantanément après un redémarrage.
+
+Les tableaux projetés sont en lecture seule : une écriture en place
+(df.loc[...] = ...) lève ValueError (« assignment destination is
+read-only »). Pour modifier des valeurs, travailler sur une copie
+(df.copy()) ; remplacer une colonne entière (df[col] = ...) n'écrit pas dans
+la projection. Le fichier n'est jamais modifié.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from acoustics import CACHE_DIR
+
+# Version du format : un répertoire d'une autre version est ignoré
+FORMAT_VERSION = 1
+
+META = "meta.json"
+
+
+def mapped_path(key):
+    return CACHE_DIR / f"{key}.cols"
+
+
+def save_frame(df, path):
+    """
+    Écrit `df` (indexé par dates, colonnes numériques) dans le répertoire
+    `path`. Le répertoire n'apparaît qu'une fois complet ; s'il existe déjà
+    (écrit entre-temps par une autre session), il est gardé tel quel.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=path.parent, suffix=".tmp")
+    try:
+        columns = []
+        for i, (name, col) in enumerate(df.items()):
+            values = col.to_numpy()
+            np.save(os.path.join(tmp, f"c{i}.npy"), values, allow_pickle=False)
+            columns.append({"name": name, "file": f"c{i}.npy", "dtype": str(values.dtype)})
+        np.save(os.path.join(tmp, "index.npy"), df.index.to_numpy(), allow_pickle=False)
+        meta = {"version": FORMAT_VERSION, "rows": len(df), "index": df.index.name,
+                "columns": columns, "attrs": df.attrs}
+        with open(os.path.join(tmp, META), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Un autre processus a écrit le même tableau : le sien est gardé
+            pass
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_frame(path):
+    """
+    Tableau du répertoire `path`, colonnes et index projetés en lecture
+    seule sans copie ; None si le répertoire est absent ou incomplet.
+    """
+    path = Path(path)
+    try:
+        with open(path / META, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            return None
+        index = np.load(path / "index.npy", mmap_mode="r", allow_pickle=False)
+        data = {c["name"]: np.load(path / c["file"], mmap_mode="r", allow_pickle=False) for c in meta["columns"]}
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(index) != meta["rows"] or any(len(v) != meta["rows"] for v in data.values()):
+        return None
+    df = pd.DataFrame(data, index=pd.DatetimeIndex(index, copy=False, name=meta["index"]), copy=False)
+    df.attrs.update(meta["attrs"])
+    return df
+
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def mapped_bytes(df):
+    """Octets de `df` lus dans des fichiers projetés (hors de la mémoire propre du processus)."""
+    arrays = [df.index.to_numpy()] + [col.to_numpy() for _, col in df.items()]
+    return sum(a.nbytes for a in arrays if _is_mapped(a))
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Figure Multi-Trace (matplotlib) : LAeq, vent, %HR et température sur des
+axes jumeaux, flèches de direction du vent et traces superposées sur l'axe
+LAeq (Leq glissant, niveaux par intervalle).
+
+La figure est construite à partir de séries déjà réduites (voir
+acoustics.query.reduced) ; elle est utilisée par la page Multi-Trace et par
+benchmarks.bench_render. matplotlib n'est chargé qu'au premier tracé.
+"""
+
+import numpy as np
+
+from acoustics.wind import direction_labels, thin_vectors
+
+# Taille (po) et résolution de tracé
+FIGSIZE = (18, 10)
+FIGURE_DPI = 100
+
+# Direction du vent : nombre maximal de flèches, et largeur (po) réservée à
+# chaque étiquette pour qu'elles ne se chevauchent pas
+MAX_ARROWS = 300
+LABEL_WIDTH_IN = 0.5
+
+WIND_COL = "Wind Speed avg"
+HUMIDITY_COL = "Amb. Humidity"
+TEMPERATURE_COL = "Amb. Temperature"
+
+
+def arrow_height(laeq_min, laeq_max):
+    """Hauteur des flèches de direction sur l'axe LAeq, juste sous le haut de l'axe."""
+    return laeq_max - (laeq_max - laeq_min) * 0.05
+
+
+def multitrace_figure(traces, title, x_range, limits, kmh=False, vectors=None, labels=False, overlays=(),
+                      figsize=FIGSIZE, dpi=FIGURE_DPI):
+    """
+    Construit la figure Multi-Trace et la retourne (matplotlib.figure.Figure).
+
+    `traces` est {colonne: (dates, valeurs)} : LAeq toujours, vent (en m/s),
+    %HR et température tracés s'ils sont présents. `limits` donne
+    (minimum, maximum) de l'axe de chaque colonne tracée, le vent dans
+    l'unité d'affichage (km/h si `kmh`). `vectors` est le tableau de
+    compute_wind_vectors (flèches de direction, avec étiquettes si
+    `labels`) et `overlays` des traces en dB sur l'axe LAeq :
+    (dates, niveaux, nom, couleur, en escalier).
+    """
+    import matplotlib.dates as mdates
+    from matplotlib.figure import Figure
+
+    laeq_min, laeq_max = limits["LAeq"]
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax1 = fig.subplots()
+    ax1.grid(True)
+
+    # LAeq
+    ax1.plot(*traces["LAeq"], color="C0")
+    ax1.set_ylabel("LAeq", color="C0")
+    ax1.tick_params(axis="x", rotation=55)
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d %H:%M:%S"))
+    ax1.set_ylim(laeq_min, laeq_max)
+    ax1.set_title(title)
+
+    ax1.set_xlim(*x_range)
+
+    # Leq glissant et niveaux par intervalle
+    for times, values, name, color, step in overlays:
+        if step:
+            ax1.step(times, values, where="post", color=color, label=name)
+        else:
+            ax1.plot(times, values, color=color, label=name)
+    if overlays:
+        ax1.legend(loc="upper left")
+
+    # Vent
+    if WIND_COL in traces:
+        ax2 = ax1.twinx()
+        wind_time, wind_speed = traces[WIND_COL]
+        if kmh:
+            ax2.plot(wind_time, wind_speed * 3.6, color="C1")
+            ax2.set_ylabel("Vent vitesse (km/h)", color="C1")
+        else:
+            ax2.plot(wind_time, wind_speed, color="C1")
+            ax2.set_ylabel("Vent vitesse (m/s)", color="C1")
+        ax2.set_ylim(*limits[WIND_COL])
+
+    # HR
+    if HUMIDITY_COL in traces:
+        ax3 = ax1.twinx()
+        ax3.spines["right"].set_position(("outward", 40))
+        ax3.plot(*traces[HUMIDITY_COL], color="C2")
+        ax3.set_ylabel("%HR", color="C2")
+        ax3.set_ylim(*limits[HUMIDITY_COL])
+
+    # Température
+    if TEMPERATURE_COL in traces:
+        ax4 = ax1.twinx()
+        ax4.spines["right"].set_position(("outward", 100))
+        ax4.plot(*traces[TEMPERATURE_COL], color="C4")
+        ax4.set_ylabel("Température (°C)", color="C4")
+        ax4.set_ylim(*limits[TEMPERATURE_COL])
+
+    # Direction du vent
+    if vectors is not None:
+        y_arrow = arrow_height(laeq_min, laeq_max)
+        ax_top = ax1.twiny()
+        n_vectors = len(vectors)
+        # Au-delà de MAX_ARROWS, un intervalle sur plusieurs ; l'axe garde
+        # la graduation de tous les intervalles
+        arrows, _ = thin_vectors(vectors, MAX_ARROWS)
+        wind_rad = np.radians(arrows["MeanWindDirection"].to_numpy())
+
+        ax_top.quiver(
+            arrows.index,
+            np.full(len(arrows), y_arrow),
+            np.cos(wind_rad),
+            np.sin(-wind_rad),
+            scale_units="xy",
+            scale=1,
+            width=0.003
+        )
+        margin = 0.05 * max(n_vectors - 1, 1)
+        ax_top.set_xlim(-margin, n_vectors - 1 + margin)
+
+        if labels:
+            y_label = y_arrow - (laeq_max - laeq_min) * 0.03
+            # Autant d'étiquettes que la largeur des axes en contient,
+            # placées sous une partie des flèches tracées
+            axes_width = figsize[0] * ax1.get_position().width
+            labelled, _ = thin_vectors(arrows, int(axes_width / LABEL_WIDTH_IN))
+            for x, label in zip(labelled.index, direction_labels(labelled)):
+                ax_top.text(x, y_label, label, color="red", ha="center", fontsize=8)
+
+    return fig
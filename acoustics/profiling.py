@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Durée et mémoire de chaque étape d'une exécution de page (diagnostic).
+
+Le diagnostic est désactivé par défaut : stage() retourne alors un contexte
+vide partagé, ce qui ne coûte qu'une lecture d'attribut. Une fois activé
+pour le fil d'exécution courant (streamlit exécute chaque session dans son
+propre fil), chaque étape nommée enregistre sa durée. Les enregistrements
+sont affichés dans le panneau de diagnostic et ajoutés à un journal JSONL
+pour analyse.
+
+Le pic de mémoire allouée pendant chaque étape (tracemalloc) n'est mesuré
+que si le diagnostic est activé pour tout le processus (variable
+d'environnement ACOUSTICS_PROFILE=1) : le traçage et son pic sont communs à
+tous les fils, si bien qu'un diagnostic demandé par une seule session
+ralentirait les autres et que leurs allocations fausseraient ses mesures.
+Même alors, les étapes ne doivent pas être imbriquées (le pic est remis à
+zéro au début de chacune), et la mémoire n'est exacte que si une seule page
+s'exécute à la fois.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from acoustics import CACHE_DIR
+
+# Catégories d'étapes utilisées par les pages
+STAGES = ("lecture", "transformation", "agrégation", "rendu", "encodage")
+
+LOG_PATH = Path(os.environ.get("ACOUSTICS_PROFILE_LOG", CACHE_DIR / "profil.jsonl"))
+
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+
+# Mémoire mesurée seulement pour un diagnostic de tout le processus
+TRACE_MEMORY = os.environ.get("ACOUSTICS_PROFILE") == "1"
+
+_tracing_lock = threading.Lock()
+
+
+def _start_tracing():
+    # Démarré une fois et jamais arrêté : toutes les sessions sont diagnostiquées
+    with _tracing_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+class Profiler:
+    """
+    Enregistrements des étapes d'une exécution de page ; mémoire de chaque
+    étape si `memory` (sinon None).
+    """
+
+    def __init__(self, page, memory=False):
+        self.page = page
+        self.memory = memory
+        self.run_id = uuid.uuid4().hex[:8]
+        self.records = []
+        self.total = None
+        self._t0 = time.perf_counter()
+
+    def record(self, kind, label, seconds, memory_mb=None):
+        self.records.append({
+            "date": datetime.now().isoformat(timespec="milliseconds"),
+            "page": self.page,
+            "execution": self.run_id,
+            "etape": kind,
+            "detail": label or "",
+            "secondes": round(seconds, 6),
+            "memoire_mo": None if memory_mb is None else round(memory_mb, 3),
+        })
+        return self.records[-1]
+
+    @contextlib.contextmanager
+    def stage(self, kind, label=None):
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_mem = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0
+            memory_mb = None
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                memory_mb = max(peak - start_mem, 0) / 1024**2
+            self.record(kind, label, seconds, memory_mb)
+
+    def finish(self):
+        self.total = time.perf_counter() - self._t0
+        return self.record("total", None, self.total)
+
+
+def start(page, memory=TRACE_MEMORY):
+    """
+    Active le diagnostic pour l'exécution en cours dans ce fil, avec la
+    mémoire de chaque étape si `memory` (par défaut, seulement quand
+    ACOUSTICS_PROFILE=1 active le diagnostic pour tout le processus).
+    """
+    profiler = Profiler(page, memory=memory)
+    if memory:
+        _start_tracing()
+    _local.profiler = profiler
+    return profiler
+
+
+def stop(log_path=LOG_PATH):
+    """Termine le diagnostic du fil courant, écrit le journal et retourne le Profiler."""
+    profiler = _local.__dict__.pop("profiler", None)
+    if profiler is None:
+        return None
+    profiler.finish()
+    append_log(profiler.records, log_path)
+    return profiler
+
+
+def stage(kind, label=None):
+    """
+    Contexte qui mesure une étape de la page, par exemple :
+
+        with stage("agrégation", "vecteurs de vent"):
+            vectors = compute_wind_vectors(df)
+
+    Sans diagnostic actif, retourne un contexte vide.
+    """
+    profiler = getattr(_local, "profiler", None)
+    if profiler is None:
+        return _NULL
+    return profiler.stage(kind, label)
+
+
+def timed(kind, fn, label=None, log_path=LOG_PATH):
+    """
+    Enveloppe une fonction appelée plus tard (export différé au clic) pour
+    journaliser sa durée. Sans diagnostic actif, retourne `fn` telle quelle.
+    """
+    profiler = getattr(_local, "profiler", None)
+    if profiler is None:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record = profiler.record(kind, label, time.perf_counter() - t0)
+            append_log([record], log_path)
+
+    return wrapper
+
+
+def append_log(records, log_path=LOG_PATH):
+    """Ajoute les enregistrements au journal, un objet JSON par ligne."""
+    try:
+        log_path = Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError:
+        # Le diagnostic ne doit jamais empêcher l'affichage de la page
+        pass
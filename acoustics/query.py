@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Calculs sur une période d'une source de mesures : tableau en mémoire ou
+station de l'archive (voir acoustics.archive).
+
+Une station est parcourue jour par jour, en ne lisant que les colonnes
+utiles au calcul ; d'un jour à l'autre, seul ce qui se cumule est conservé
+(points réduits, sommes de vent, sommes d'énergie), si bien que la mémoire
+ne dépend pas de la longueur de la période. Un tableau en mémoire (indexé
+par dates triées, voir acoustics.loader.compact_frame) est traité comme un
+seul morceau : les pages utilisent les mêmes fonctions pour les deux sources.
+"""
+
+import numpy as np
+import pandas as pd
+
+from acoustics.archive import Station
+from acoustics.batch import LEVEL_COLUMNS, daily_table, period_energy
+from acoustics.downsample import m4_indices
+from acoustics.indicators import interval_table, rolling_leq
+from acoustics.lden import LdenAccumulator
+from acoustics.loader import GAP_FACTOR
+from acoustics.timeindex import time_window, window_slice
+from acoustics.wind import combine_wind_sums, vectors_from_sums, wind_sums
+
+
+def frames(source, start=None, end=None, columns=None):
+    """
+    Mesures de `source` comprises entre start et end, par morceaux.
+
+    Pour une station, un tableau par jour limité à `columns` ; pour un
+    tableau en mémoire, la période sélectionnée sans copie (toutes colonnes).
+    """
+    if isinstance(source, Station):
+        yield from source.scan(start, end, columns)
+        return
+    if not len(source):
+        return
+    window = time_window(source, source.index[0] if start is None else start,
+                         source.index[-1] if end is None else end)
+    if len(window):
+        yield window
+
+
+def span(source):
+    """Première et dernière date-heure de `source`."""
+    if isinstance(source, Station):
+        return source.span()
+    return source.index[0], source.index[-1]
+
+
+def extents(source, columns=None):
+    """{colonne: (minimum, maximum)} de toute la source, pour les indications d'échelle."""
+    if isinstance(source, Station):
+        return source.extents(columns)
+    columns = source.columns if columns is None else columns
+    return {col: (float(source[col].min()), float(source[col].max())) for col in columns}
+
+
+def _as_int(timestamp, times):
+    # Date dans l'unité (ns, µs...) des dates `times`, en entier comme times.view("int64")
+    return int(pd.Timestamp(timestamp).to_datetime64().astype(times.dtype).view("int64"))
+
+
+def reduced(source, start, end, columns, n_buckets, gap_factor=GAP_FACTOR):
+    """
+    Points de `columns` entre start et end réduits pour le tracé (M4, voir
+    acoustics.downsample) : {colonne: (dates, valeurs)}.
+
+    Les intervalles de réduction découpent toute la période, si bien qu'une
+    station lue jour par jour donne le même tracé qu'un seul tableau. Entre
+    deux jours séparés de plus de `gap_factor` pas de mesure, un point NaN
+    interrompt le tracé.
+    """
+    parts = {col: ([], []) for col in columns}
+    previous = None  # (dernière date, pas de mesure) du morceau précédent, en entiers
+    for frame in frames(source, start, end, columns):
+        times = frame.index.to_numpy()
+        x = times.view("int64")
+        x_range = (_as_int(start, times), _as_int(end, times))
+        if previous is not None and previous[1] is not None and x[0] - previous[0] > gap_factor * previous[1]:
+            for col in columns:
+                parts[col][0].append(np.array([previous[0] + previous[1]]).view(times.dtype))
+                parts[col][1].append(np.array([np.nan]))
+        for col in columns:
+            values = frame[col].to_numpy()
+            idx = m4_indices(x, values, n_buckets, x_range=x_range)
+            parts[col][0].append(times[idx])
+            parts[col][1].append(values[idx])
+        previous = (int(x[-1]), int(np.median(np.diff(x))) if len(x) > 1 else None)
+    return {col: (pd.DatetimeIndex(np.concatenate(t)) if t else pd.DatetimeIndex([]),
+                  np.concatenate(v) if v else np.array([]))
+            for col, (t, v) in parts.items()}
+
+
+def wind_vectors(source, start, end, freq="5Min", speed_col="Wind Speed avg", dir_col="Wind Dir. avg"):
+    """Vecteurs de vent (voir acoustics.wind) par intervalle de `freq` entre start et end."""
+    sums = [wind_sums(frame, freq, speed_col=speed_col, dir_col=dir_col)
+            for frame in frames(source, start, end, [speed_col, dir_col])]
+    return vectors_from_sums(combine_wind_sums(sums, freq))
+
+
+def rolling_reduced(source, start, end, window, n_buckets, column="LAeq"):
+    """
+    Leq glissant sur `window` entre start et end, réduit pour le tracé (M4) :
+    (dates, niveaux).
+
+    Le calcul commence une fenêtre avant `start`, pour que le premier point
+    couvre une fenêtre complète ; d'un jour à l'autre, seules les mesures de
+    la dernière fenêtre sont conservées.
+    """
+    width = pd.Timedelta(window)
+    tail = None
+    times_parts, value_parts = [], []
+    for frame in frames(source, start - width, end, [column]):
+        series = frame[column]
+        work = series if tail is None else pd.concat([tail, series])
+        leq = rolling_leq(work, window).iloc[len(work) - len(series):]
+        last = work.index[-1]
+        tail = work.iloc[window_slice(work.index.to_numpy(), last - width + pd.Timedelta(1, "ns"), last)]
+        visible = time_window(leq, start, end)
+        if not len(visible):
+            continue
+        times = visible.index.to_numpy()
+        idx = m4_indices(times.view("int64"), visible.to_numpy(), n_buckets,
+                         x_range=(_as_int(start, times), _as_int(end, times)))
+        times_parts.append(times[idx])
+        value_parts.append(visible.to_numpy()[idx])
+    if not times_parts:
+        return pd.DatetimeIndex([]), np.array([])
+    return pd.DatetimeIndex(np.concatenate(times_parts)), np.concatenate(value_parts)
+
+
+def interval_levels(source, start, end, freq="1h", column="LAeq"):
+    """
+    Leq, L10, L50 et L90 par intervalle de `freq` (voir
+    acoustics.indicators.interval_table), à partir du début de l'intervalle
+    qui contient `start`.
+
+    Une station étant lue jour par jour, `freq` doit diviser la journée
+    (15 min, 1 h...) pour qu'aucun intervalle ne soit coupé en deux.
+    """
+    tables = [interval_table(frame[column], freq)
+              for frame in frames(source, pd.Timestamp(start).floor(freq), end, [column])]
+    if not tables:
+        return interval_table(pd.Series([], index=pd.DatetimeIndex([]), dtype=float), freq)
+    return pd.concat(tables) if len(tables) > 1 else tables[0]
+
+
+def lden(source, start=None, end=None, column="LAeq"):
+    """
+    Ljour, Lsoir, Lnuit et Lden de la période, et tableau des mêmes niveaux
+    par jour civil (voir acoustics.batch.daily_table).
+
+    Seules les sommes d'énergie par jour et par période sont conservées d'un
+    jour à l'autre.
+    """
+    acc = LdenAccumulator()
+    energies = []
+    for frame in frames(source, start, end, [column]):
+        laeq = frame[column].to_numpy()
+        acc.add(frame.index.hour.to_numpy(), laeq)
+        energies.append(period_energy(frame.index, laeq))
+    if not energies:
+        return acc.result(), pd.DataFrame(columns=["Date"] + LEVEL_COLUMNS + ["Lden", "Nb mesures"])
+    table = daily_table(pd.concat(energies))
+    table["Date"] = table["Date"].dt.date
+    return acc.result(), table
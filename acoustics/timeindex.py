@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+Sélection d'une période dans une série triée par date-heure.
+
+Les dates étant triées une fois pour toutes, les bornes d'une période se
+trouvent par recherche dichotomique : le coût ne dépend que de la taille de
+la période affichée, pas de celle du fichier.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def window_slice(times, start, end):
+    """Tranche des positions telles que start <= times <= end (`times` trié)."""
+    times = np.asarray(times)
+    lo = np.searchsorted(times, pd.Timestamp(start).to_datetime64().astype(times.dtype), side="left")
+    hi = np.searchsorted(times, pd.Timestamp(end).to_datetime64().astype(times.dtype), side="right")
+    return slice(int(lo), int(hi))
+
+
+def time_window(df, start, end):
+    """Lignes de `df` (indexé par dates triées) comprises entre start et end."""
+    return df.iloc[window_slice(df.index.to_numpy(), start, end)]
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Agrégation des données de vent (vitesse moyenne, direction moyenne, sigma thêta).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def calculate_mean_direction_and_sigma_theta(wind_directions):
+    wind_directions_rad = np.radians(wind_directions - 270)
+    mean_sin = np.mean(np.sin(wind_directions_rad))
+    mean_cos = np.mean(np.cos(wind_directions_rad))
+    mean_direction = np.degrees(np.arctan2(mean_sin, mean_cos))
+    sigma_theta = np.degrees(np.sqrt(-2 * np.log(np.sqrt(mean_sin**2 + mean_cos**2))))
+    return mean_direction, sigma_theta
+
+
+def wind_sums(df, freq="5Min", time_col="Start Time",
+              speed_col="Wind Speed avg", dir_col="Wind Dir. avg"):
+    """
+    Sommes et nombres de valeurs (vitesse, sinus et cosinus de la direction)
+    par intervalle de `freq`.
+
+    Contrairement aux moyennes, ces sommes s'additionnent : une série lue
+    par morceaux donne les mêmes vecteurs que la série entière (voir
+    combine_wind_sums). Les dates sont lues dans la colonne `time_col`, ou
+    dans l'index si `df` est indexé par date.
+    """
+    times = df[time_col] if time_col in df.columns else df.index
+    wind_directions_rad = np.radians(df[dir_col].to_numpy(dtype=float) - 270)
+    work = pd.DataFrame(
+        {
+            "speed": df[speed_col].to_numpy(dtype=float),
+            "sin": np.sin(wind_directions_rad),
+            "cos": np.cos(wind_directions_rad),
+        },
+        index=pd.DatetimeIndex(times),
+    )
+    # Mêmes intervalles que pd.Grouper(freq=...) ; les NaN sont ignorés
+    grouped = work.resample(freq)
+    return pd.concat({"sum": grouped.sum(), "count": grouped.count()}, axis=1)
+
+
+def combine_wind_sums(parts, freq="5Min"):
+    """Sommes de wind_sums de plusieurs morceaux, intervalles vides compris."""
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.concat({"sum": pd.DataFrame(columns=["speed", "sin", "cos"], dtype=float),
+                          "count": pd.DataFrame(columns=["speed", "sin", "cos"], dtype=np.int64)}, axis=1)
+    # Les dates des sommes étant des débuts d'intervalle, le rééchantillonnage
+    # regroupe les morceaux d'un même intervalle et ajoute les intervalles vides
+    return pd.concat(parts).resample(freq).sum()
+
+
+def vectors_from_sums(sums, time_col="Start Time"):
+    """Vitesse moyenne, direction moyenne et sigma thêta à partir des sommes de wind_sums."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums["sum"] / sums["count"]
+
+    mean_sin = means["sin"].to_numpy(dtype=float)
+    mean_cos = means["cos"].to_numpy(dtype=float)
+    # Longueur du vecteur moyen bornée à 1 : les erreurs d'arrondi ne doivent
+    # pas produire un log positif (sigma NaN) pour une direction constante.
+    # + 0.0 : le zéro négatif d'une direction constante (-2 · 0.0) devient 0.0
+    resultant = np.minimum(np.sqrt(mean_sin**2 + mean_cos**2), 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_theta = np.degrees(np.sqrt(-2 * np.log(resultant))) + 0.0
+
+    return pd.DataFrame({
+        time_col: sums.index,
+        "MeanWindSpeed": means["speed"].to_numpy(dtype=float),
+        "MeanWindDirection": np.degrees(np.arctan2(mean_sin, mean_cos)),
+        "SigmaTheta": sigma_theta,
+    })
+
+
+def compute_wind_vectors(df, freq="5Min", time_col="Start Time",
+                         speed_col="Wind Speed avg", dir_col="Wind Dir. avg"):
+    """
+    Vitesse moyenne, direction moyenne et sigma thêta par intervalle de `freq`.
+
+    Les sommes de sinus/cosinus et de vitesses sont calculées pour tous les
+    intervalles en un seul rééchantillonnage, au lieu d'un appel à
+    calculate_mean_direction_and_sigma_theta par groupe. Les dates sont lues
+    dans la colonne `time_col`, ou dans l'index si `df` est indexé par date.
+    """
+    sums = wind_sums(df, freq, time_col=time_col, speed_col=speed_col, dir_col=dir_col)
+    return vectors_from_sums(sums, time_col=time_col)
+
+
+def thin_vectors(vectors, max_count):
+    """
+    Un intervalle sur `step` du tableau de compute_wind_vectors, `step` étant
+    le plus petit pas qui en laisse au plus `max_count`. Retourne
+    (intervalles conservés, step) ; l'index d'origine est conservé.
+    """
+    step = max(1, -(-len(vectors) // max(max_count, 1)))
+    return vectors.iloc[::step], step
+
+
+def direction_labels(vectors):
+    """Étiquettes « direction (sigma thêta) » de chaque intervalle, formatées d'un bloc."""
+    direction = np.char.mod("%.1f", vectors["MeanWindDirection"].to_numpy() + 270)
+    sigma = np.char.mod("%.1f", vectors["SigmaTheta"].to_numpy())
+    return np.char.add(np.char.add(direction, "\n("), np.char.add(sigma, ")"))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Calculs longs des pages exécutés hors du fil du script (voir acoustics.jobs).
+
+Pendant le calcul, la page n'affiche qu'une barre d'avancement : toute
+interaction avec un widget interrompt cette attente et relance le script,
+sans attendre la fin du calcul. Chaque session garde un travail par
+emplacement (« lecture », « image »...) : quand les entrées changent, le
+travail précédent de l'emplacement est abandonné et annulé si aucune autre
+session ne l'attend.
+"""
+
+import streamlit as st
+
+from acoustics.jobs import queue
+
+STATE_KEY = "travaux"
+
+# Intervalle (s) de mise à jour de la barre d'avancement
+POLL_SECONDS = 0.2
+
+
+def run(slot, key, fn, *args, label="Calcul en cours...", **kwargs):
+    """
+    Résultat de fn(*args, **kwargs), calculé en arrière-plan et réutilisé
+    tant que `key` (les entrées du calcul) ne change pas.
+    """
+    jobs = st.session_state.setdefault(STATE_KEY, {})
+    job = jobs.get(slot)
+    if job is not None and (job.key != key or job.failed()):
+        queue.release(job)
+        job = None
+    if job is None:
+        job = jobs[slot] = queue.submit(key, fn, *args, **kwargs)
+
+    if not job.done():
+        progress = st.progress(job.fraction, text=label)
+        while not job.wait(POLL_SECONDS):
+            progress.progress(job.fraction, text=f"{label} {job.message}".strip())
+        progress.empty()
+    return job.result()
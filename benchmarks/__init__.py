@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Mesures de performance des étapes coûteuses de l'application.
+
+À lancer depuis la racine du dépôt, par exemple :
+    python -m benchmarks.bench_ingest --duree 6h
+    python -m benchmarks.suite --durees 1D 7D 30D -o resultats.json
+    python -m benchmarks.startup
+"""
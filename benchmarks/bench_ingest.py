@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Compare la lecture d'un export Excel par openpyxl à la lecture Parquet.
+
+    python -m benchmarks.bench_ingest --duree 6h
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from acoustics.columnar import MULTITRACE_COLUMNS, convert_file, read_columnar
+from benchmarks.synthetic import sonometer_frame
+
+
+def measure(fn):
+    """
+    Durée (s) et pic de mémoire allouée (Mo) d'un appel à `fn`.
+
+    tracemalloc ralentit fortement le code Python : la durée est mesurée lors
+    d'un premier appel, le pic de mémoire lors d'un second. Les tampons
+    alloués directement par Arrow ne sont pas vus par tracemalloc.
+    """
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / 1024**2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duree", default="6h", help="durée des données synthétiques (ex. 1h, 6h, 1D)")
+    args = parser.parse_args(argv)
+
+    df = sonometer_frame(args.duree)
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = Path(tmp) / "export.xlsx"
+        parquet = Path(tmp) / "export.parquet"
+        print(f"Écriture de {len(df)} lignes dans {xlsx.name}...")
+        df.to_excel(xlsx, index=False)
+
+        cases = [
+            ("openpyxl (read_excel)", lambda: pd.read_excel(xlsx, engine="openpyxl")),
+            ("conversion vers Parquet", lambda: convert_file(xlsx, parquet)),
+            ("Parquet, toutes colonnes", lambda: read_columnar(parquet)),
+            ("Parquet, colonnes Multi-Trace", lambda: read_columnar(parquet, MULTITRACE_COLUMNS)),
+        ]
+        print(f"{'lecture':<32}{'durée (s)':>12}{'pic mémoire (Mo)':>20}")
+        for label, fn in cases:
+            elapsed, peak = measure(fn)
+            print(f"{label:<32}{elapsed:>12.3f}{peak:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Compare le rendu de la figure Multi-Trace (tracé + encodage PNG) avec toutes
+les mesures et après réduction M4.
+
+    python -m benchmarks.bench_render --duree 7D
+"""
+
+import argparse
+import io
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from acoustics.downsample import m4_indices, points_for_width  # noqa: E402
+from acoustics.multitrace import FIGSIZE, FIGURE_DPI, multitrace_figure  # noqa: E402
+from acoustics.wind import compute_wind_vectors  # noqa: E402
+from benchmarks.synthetic import sonometer_frame  # noqa: E402
+
+COLUMNS = ["LAeq", "Wind Speed avg", "Amb. Humidity", "Amb. Temperature"]
+
+# Échelles par défaut de la page Multi-Trace
+LIMITS = {"LAeq": (30, 70), "Wind Speed avg": (0, 90), "Amb. Humidity": (0, 100), "Amb. Temperature": (-10, 35)}
+
+
+def render(df, downsample, vectors=None):
+    """
+    Trace la figure de la page Multi-Trace (quatre séries, et flèches de
+    direction si `vectors`) et l'encode en PNG ; retourne la taille du PNG.
+    """
+    x = df["Start Time"].to_numpy()
+    n_buckets = points_for_width(FIGSIZE[0] * FIGURE_DPI)
+    traces = {}
+    for col in COLUMNS:
+        y = df[col].to_numpy()
+        if downsample:
+            idx = m4_indices(x.view("int64"), y, n_buckets)
+            traces[col] = (x[idx], y[idx])
+        else:
+            traces[col] = (x, y)
+    fig = multitrace_figure(traces, "Banc d'essai", (x[0], x[-1]), LIMITS, kmh=True, vectors=vectors)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return len(buffer.getvalue())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duree", default="7D", help="durée des données synthétiques à 1 s (ex. 1D, 7D)")
+    args = parser.parse_args(argv)
+
+    df = sonometer_frame(args.duree)
+    vectors = compute_wind_vectors(df)
+    print(f"{len(df)} mesures par série")
+    print(f"{'rendu':<20}{'durée (s)':>12}{'PNG (ko)':>12}")
+    for label, downsample in (("complet", False), ("réduit (M4)", True)):
+        t0 = time.perf_counter()
+        size = render(df, downsample, vectors)
+        print(f"{label:<20}{time.perf_counter() - t0:>12.3f}{size / 1024:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
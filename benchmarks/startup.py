@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Démarrage à froid de chaque page : durée de la première exécution et
+bibliothèques lourdes chargées.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup main.py page_2.py -o demarrage.json
+
+Chaque page est exécutée (sans fichier téléversé) dans un nouvel
+interpréteur, par le banc d'essai de streamlit : la durée mesurée comprend
+les imports de la page et de ses modules, mais pas celui de streamlit, mesuré
+à part. Pour le détail des imports d'une page :
+    python -X importtime -c "import acoustics.loader" 2> imports.txt
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAGES = ["streamlit_app.py", "main.py", "page_2.py", "page_3.py", "page4.py", "page5.py"]
+
+# Bibliothèques dont l'import coûte plus de 0,1 s
+HEAVY = ["numpy", "pandas", "pyarrow", "openpyxl", "matplotlib", "altair"]
+
+# Exécuté dans l'interpréteur neuf ; écrit un objet JSON sur la sortie standard
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_streamlit": t1 - t0,
+    "premiere_execution": t2 - t1,
+    "erreurs": [str(e.value) for e in at.exception],
+    "modules": [m for m in sys.argv[2:] if m in sys.modules],
+}))
+"""
+
+
+def cold_start(page, repeat=3):
+    """Meilleure durée de `repeat` démarrages à froid de `page`."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _CHILD, str(ROOT / page), *HEAVY],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["premiere_execution"])
+    return {"page": page,
+            "import_streamlit": round(best["import_streamlit"], 3),
+            "secondes": round(best["premiere_execution"], 3),
+            "modules_lourds": best["modules"],
+            "erreurs": best["erreurs"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Durée de démarrage à froid de chaque page.")
+    parser.add_argument("pages", nargs="*", default=PAGES, help="pages à mesurer")
+    parser.add_argument("-n", "--repetitions", type=int, default=3, help="démarrages par page (le meilleur est gardé)")
+    parser.add_argument("-o", "--sortie", type=Path, help="fichier JSON des résultats")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'page':<20}{'durée (s)':>10}  bibliothèques chargées")
+    for page in args.pages:
+        r = cold_start(page, repeat=args.repetitions)
+        results.append(r)
+        print(f"{page:<20}{r['secondes']:>10.3f}  {', '.join(r['modules_lourds']) or '-'}", flush=True)
+        for erreur in r["erreurs"]:
+            print(f"    erreur : {erreur}")
+    if args.sortie:
+        report = {"date": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+                  "resultats": results}
+        args.sortie.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Suite de mesures des étapes coûteuses, sur des données synthétiques à 1 s.
+
+    python -m benchmarks.suite --durees 1D 7D 30D -o resultats.json
+    python -m benchmarks.suite --durees 1D --comparer resultats.json
+
+Pour chaque durée : lecture CSV et Excel (jeux de 100 000 lignes au plus,
+par défaut), calcul Lden (en mémoire et par morceaux), compute_wind_vectors,
+rendu Multi-Trace avec encodage PNG et rose des vents. Les résultats (durée, pic de mémoire) sont écrits en JSON
+avec la version des bibliothèques, pour comparer les exécutions entre elles.
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from acoustics.lden import lden_from_frame, lden_streaming  # noqa: E402
+from acoustics.rose import plot_rose, rose_table  # noqa: E402
+from acoustics.wind import compute_wind_vectors  # noqa: E402
+from benchmarks.bench_ingest import measure  # noqa: E402
+from benchmarks.bench_render import render  # noqa: E402
+from benchmarks.synthetic import lden_frame, sonometer_frame  # noqa: E402
+
+# Nombre de lignes au-delà duquel la lecture Excel n'est pas mesurée par
+# défaut : l'écriture du classeur de test prend plusieurs minutes, et une
+# feuille Excel ne dépasse pas 1 048 576 lignes
+EXCEL_ROWS = 100_000
+
+
+def render_rose(df):
+    """Table de la rose des vents, graphique et encodage PNG."""
+    table = rose_table(df["Wind Dir. avg"], df["Wind Speed avg"])
+    fig = plt.figure(figsize=(8, 8))
+    plot_rose(table, fig=fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return len(buffer.getvalue())
+
+
+def cases(df, tmp, excel_rows=EXCEL_ROWS):
+    """Étapes mesurées pour un jeu de données, sous forme de (nom, fonction)."""
+    levels = lden_frame(df)
+    vectors = compute_wind_vectors(df)
+    csv = Path(tmp) / "export.csv"
+    levels_csv = Path(tmp) / "lden.csv"
+    df.to_csv(csv, index=False)
+    levels.to_csv(levels_csv, index=False)
+
+    steps = [("lecture CSV", lambda: pd.read_csv(csv, parse_dates=["Start Time"]))]
+    if len(df) <= excel_rows:
+        xlsx = Path(tmp) / "export.xlsx"
+        df.to_excel(xlsx, index=False)
+        steps.append(("lecture Excel", lambda: pd.read_excel(xlsx, engine="openpyxl")))
+    steps += [
+        ("Lden en mémoire", lambda: lden_from_frame(levels)),
+        ("Lden par morceaux (CSV)", lambda: lden_streaming(levels_csv)),
+        ("compute_wind_vectors", lambda: compute_wind_vectors(df)),
+        ("rendu Multi-Trace + PNG", lambda: render(df, downsample=True, vectors=vectors)),
+        ("rose des vents + PNG", lambda: render_rose(df)),
+    ]
+    return steps
+
+
+def run(durations, excel_rows=EXCEL_ROWS):
+    """Mesure chaque étape pour chaque durée ; retourne la liste des résultats."""
+    results = []
+    for duration in durations:
+        df = sonometer_frame(duration)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, fn in cases(df, tmp, excel_rows=excel_rows):
+                elapsed, peak = measure(fn)
+                results.append({"duree": duration, "lignes": len(df), "etape": name,
+                                "secondes": round(elapsed, 4), "pic_memoire_mo": round(peak, 1)})
+                print(f"{duration:<6}{name:<28}{elapsed:>10.3f} s{peak:>10.1f} Mo", flush=True)
+    return results
+
+
+def environment():
+    """Versions et machine, enregistrées avec les résultats."""
+    return {
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "processeur": platform.processor() or platform.machine(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results, reference):
+    """Affiche le rapport des durées entre `results` et un fichier de référence."""
+    old = {(r["duree"], r["etape"]): r for r in reference["resultats"]}
+    print(f"\n{'durée':<6}{'étape':<28}{'avant (s)':>12}{'après (s)':>12}{'rapport':>10}")
+    for r in results:
+        ref = old.get((r["duree"], r["etape"]))
+        if ref is None:
+            continue
+        ratio = r["secondes"] / ref["secondes"] if ref["secondes"] else float("nan")
+        print(f"{r['duree']:<6}{r['etape']:<28}{ref['secondes']:>12.3f}{r['secondes']:>12.3f}{ratio:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance sur données synthétiques à 1 s.")
+    parser.add_argument("--durees", nargs="+", default=["1D", "7D", "30D"], help="durées des jeux de données")
+    parser.add_argument("-o", "--sortie", type=Path, help="fichier JSON des résultats")
+    parser.add_argument("--excel-lignes", type=int, default=EXCEL_ROWS,
+                        help="taille maximale (lignes) des jeux pour lesquels la lecture Excel est mesurée")
+    parser.add_argument("--comparer", type=Path, help="fichier JSON d'une exécution précédente")
+    args = parser.parse_args(argv)
+
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "environnement": environment(),
+        "resultats": run(args.durees, excel_rows=args.excel_lignes),
+    }
+    if args.sortie:
+        args.sortie.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.comparer:
+        compare(report["resultats"], json.loads(args.comparer.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
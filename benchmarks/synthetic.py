@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Génération de données synthétiques au format des exports sonomètre/météo.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sonometer_frame(duration="1D", freq="1s", start="2025-06-01 00:00:00", seed=0):
+    """
+    Export synthétique couvrant `duration` à raison d'une ligne par `freq`.
+
+    Les colonnes reprennent les noms des exports réels, avec quelques
+    colonnes supplémentaires que l'application n'utilise pas.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, end=pd.Timestamp(start) + pd.Timedelta(duration), freq=freq,
+                          inclusive="left")
+    n = len(times)
+    hours = times.hour.to_numpy() + times.minute.to_numpy() / 60
+
+    # Bruit de fond jour/nuit, avec des événements bruyants ponctuels
+    laeq = 45 + 8 * np.sin((hours - 8) / 24 * 2 * np.pi) + rng.normal(0, 2, n)
+    events = rng.random(n) < 0.002
+    laeq[events] += rng.uniform(10, 30, events.sum())
+
+    wind_dir = (220 + np.cumsum(rng.normal(0, 0.5, n)) + rng.normal(0, 25, n)) % 360
+    wind_speed = np.abs(3 + np.sin(hours / 24 * 2 * np.pi) + rng.normal(0, 1.2, n))
+
+    return pd.DataFrame({
+        "Start Time": times,
+        "LAeq": laeq.round(1),
+        "LAFmax": (laeq + np.abs(rng.normal(3, 1, n))).round(1),
+        "LAFmin": (laeq - np.abs(rng.normal(3, 1, n))).round(1),
+        "Wind Speed avg": wind_speed.round(2),
+        "Wind Speed max": (wind_speed * 1.4).round(2),
+        "Wind Dir. avg": wind_dir.round(1),
+        "Amb. Humidity": np.clip(70 - 15 * np.sin((hours - 6) / 24 * 2 * np.pi) + rng.normal(0, 1, n), 0, 100).round(1),
+        "Amb. Temperature": (18 + 6 * np.sin((hours - 9) / 24 * 2 * np.pi) + rng.normal(0, 0.3, n)).round(1),
+        "Amb. Pressure": (1013 + rng.normal(0, 0.5, n)).round(1),
+        "Overload": np.zeros(n, dtype=int),
+    })
+
+
+def lden_frame(df):
+    """Colonnes (Heure, LAeq) au format attendu par la page Lden."""
+    return pd.DataFrame({"Heure": df["Start Time"].dt.strftime("%H:%M:%S"), "LAeq": df["LAeq"]})
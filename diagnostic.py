@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Exécution d'une page avec le panneau de diagnostic des performances.
+
+Le diagnostic s'active en ajoutant ?profil=1 à l'adresse de l'application,
+ou pour toutes les sessions avec la variable d'environnement
+ACOUSTICS_PROFILE=1. Les durées de chaque étape s'affichent alors dans la
+barre latérale et sont ajoutées au journal acoustics.profiling.LOG_PATH. La
+mémoire de chaque étape n'est mesurée qu'avec ACOUSTICS_PROFILE=1 (voir
+acoustics.profiling).
+"""
+
+import os
+
+import streamlit as st
+
+from acoustics import profiling
+
+
+def enabled():
+    return os.environ.get("ACOUSTICS_PROFILE") == "1" or st.query_params.get("profil") == "1"
+
+
+def run(page):
+    """Exécute `page` (retournée par st.navigation), avec diagnostic si demandé."""
+    if not enabled():
+        page.run()
+        return
+
+    profiling.start(page.title)
+    try:
+        page.run()
+    finally:
+        profiler = profiling.stop()
+    # Le panneau n'est affiché que si la page est allée jusqu'au bout
+    # (pas après st.stop ou st.rerun)
+    show_panel(profiler)
+
+
+def show_panel(profiler):
+    # pandas n'est chargé que si le diagnostic est affiché
+    import pandas as pd
+
+    table = pd.DataFrame([r for r in profiler.records if r["etape"] != "total"],
+                         columns=["etape", "detail", "secondes", "memoire_mo"])
+    table["part (%)"] = 100 * table["secondes"] / profiler.total
+    if not profiler.memory:
+        table = table.drop(columns="memoire_mo")
+    with st.sidebar.expander("⏱️ Diagnostic des performances", expanded=True):
+        st.caption(f"Exécution {profiler.run_id} : {profiler.total:.3f} s au total")
+        st.dataframe(
+            table.rename(columns={"etape": "Étape", "detail": "Détail", "secondes": "Durée (s)",
+                                  "memoire_mo": "Mémoire (Mo)", "part (%)": "Part (%)"}),
+            hide_index=True,
+            column_config={"Durée (s)": st.column_config.NumberColumn(format="%.3f"),
+                           "Mémoire (Mo)": st.column_config.NumberColumn(format="%.1f"),
+                           "Part (%)": st.column_config.NumberColumn(format="%.0f")},
+        )
+        if not profiler.memory:
+            st.caption("Mémoire non mesurée : diagnostic de cette session seulement "
+                       "(ACOUSTICS_PROFILE=1 pour la mesurer).")
+        st.caption(f"Journal : {profiling.LOG_PATH}")
@@ -6,11 +6,12 @@ Created on Tue Sep  2 10:28:06 2025
 """
 
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
-from windrose import WindroseAxes
-import io
+
+from acoustics.export import FORMATS, deferred_export, export_file_name, export_mime
+from acoustics.loader import cache_stats, file_digest, load_table
+from acoustics.profiling import stage, timed
+from acoustics.rose import DEFAULT_BINS, plot_rose, rose_table
+import session_data
 
 # Titre de la page
 st.title("Rose des vents")
@@ -20,24 +21,57 @@ kmh = st.sidebar.checkbox("Vitesse en km/h")
 titre_on = st.sidebar.checkbox("inscrire titre du graphique")
 transparent_bg = st.sidebar.checkbox("Fond transparent")
 download_image = st.sidebar.checkbox("Télécharger l'image")
+if download_image:
+    format_image = st.sidebar.selectbox("Format de l'image", list(FORMATS))
+unite = "km/h" if kmh else "m/s"
+nsector = st.sidebar.selectbox("Nombre de secteurs", [8, 16, 36], index=1)
+classes_texte = st.sidebar.text_input(
+    f"Classes de vitesse ({unite})",
+    value=", ".join(f"{b:g}" for b in DEFAULT_BINS[unite]),
+    key=f"classes_{unite}",
+    help="Bornes inférieures des classes, séparées par des virgules ; la dernière classe est ouverte."
+)
+try:
+    bins = tuple(sorted(float(b) for b in classes_texte.split(",") if b.strip())) or DEFAULT_BINS[unite]
+except ValueError:
+    st.sidebar.error("Classes de vitesse invalides : classes par défaut utilisées.")
+    bins = DEFAULT_BINS[unite]
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def table_rose(digest, dir_col, speed_col, nsector, bins, unite, _df):
+    # Table de fréquences mise en cache par (fichier, colonnes, secteurs,
+    # classes, unité) : changer une option d'affichage ne refait pas le calcul
+    return rose_table(_df[dir_col], _df[speed_col], nsector=nsector, bins=bins, unit=unite)
+
 
 # Chargement du fichier de données
-uploaded_file = st.file_uploader("Téléversez un fichier CSV ou Excel", type=["csv", "xlsx"])
+# (le fichier choisi reste disponible pour les autres pages de la session)
+uploaded_file = session_data.file_uploader("Téléversez un fichier CSV ou Excel", type=["csv", "xlsx"])
 
 if uploaded_file:
-    # Détection du type de fichier et lecture
-    if uploaded_file.name.endswith('.csv'):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file, engine='openpyxl')
+    # Lecture (le type de fichier est détecté d'après l'extension)
+    with stage("lecture", "load_table"):
+        if uploaded_file.name.endswith('.csv'):
+            df = load_table(uploaded_file)
+        else:
+            df = load_table(uploaded_file, engine='openpyxl')
+    stats = cache_stats()
+    st.sidebar.caption(f"Cache des fichiers : {stats['hits']} réutilisation(s), {stats['misses']} lecture(s)")
 
     st.write("Aperçu des données :")
     st.dataframe(df.head())
 
     # Sélection des colonnes
-    time_col = st.selectbox("Sélectionnez la colonne de temps", df.columns)
-    wind_speed_col = st.selectbox("Sélectionnez la colonne de vitesse du vent", df.columns)
-    wind_dir_col = st.selectbox("Sélectionnez la colonne de direction du vent", df.columns)
+    # Colonnes des exports du sonomètre proposées par défaut si présentes
+    colonnes = list(df.columns)
+
+    def choix_colonne(label, defaut):
+        return st.selectbox(label, colonnes, index=colonnes.index(defaut) if defaut in colonnes else 0)
+
+    time_col = choix_colonne("Sélectionnez la colonne de temps", "Start Time")
+    wind_speed_col = choix_colonne("Sélectionnez la colonne de vitesse du vent", "Wind Speed avg")
+    wind_dir_col = choix_colonne("Sélectionnez la colonne de direction du vent", "Wind Dir. avg")
 
     # Options supplémentaires
     ##kmh = st.sidebar.checkbox("Vitesse en km/h")
@@ -47,32 +81,43 @@ if uploaded_file:
 
     # Tracer la rose des vents
     if st.button("Tracer la rose des vents"):
-        fig = plt.figure(figsize=(8, 8))
-        ax = WindroseAxes.from_ax(fig=fig)
-        if kmh:
-           ax.bar(df[wind_dir_col], df[wind_speed_col]*3.6, normed=True, opening=0.8, edgecolor='white')
-           ax.set_legend(title="Vitesse du vent\n km/h", loc="best")
-        else:
-           ax.bar(df[wind_dir_col], df[wind_speed_col], normed=True, opening=0.8, edgecolor='white')
-           ax.set_legend(title="Vitesse du vent\n m/s", loc="best")            
-        # Format radius axis to percentages
-        fmt = '%.0f%%' 
-        yticks = mtick.FormatStrFormatter(fmt)
-        ax.yaxis.set_major_formatter(yticks)
-        
-        if titre_on: ax.set_title("Direction des vents mesurées de {0} à {1}".format(str(df[time_col][0]),str(df[time_col].iloc[-1])))
+        with stage("agrégation", "table de fréquences"):
+            table = table_rose(file_digest(uploaded_file), wind_dir_col, wind_speed_col, nsector, bins, unite, df)
+
+        with stage("rendu", "construction de la figure"):
+            # matplotlib n'est chargé qu'au premier tracé
+            import matplotlib.pyplot as plt
+
+            fig = plt.figure(figsize=(8, 8))
+            ax = plot_rose(table, fig=fig, legend_title=f"Vitesse du vent\n {unite}")
+            
+            if titre_on: ax.set_title("Direction des vents mesurées de {0} à {1}".format(str(df[time_col][0]),str(df[time_col].iloc[-1])))
 
         # Affichage du graphique
-        st.pyplot(fig)
+        with stage("encodage", "st.pyplot (dessin et PNG)"):
+            st.pyplot(fig)
+
+        plt.close(fig)
+
+        # Table de fréquences (% des mesures) utilisée pour le graphique
+        with st.expander("Table de fréquences"):
+            st.dataframe(table.style.format("{:.2f}"))
+            st.download_button(
+                label="Télécharger la table (.csv)",
+                data=table.to_csv().encode("utf-8"),
+                file_name="rose_des_vents.csv",
+                mime="text/csv",
+                on_click="ignore"
+            )
 
-        # Sauvegarde de l'image si demandé
+        # Sauvegarde de l'image si demandé : encodée seulement au clic
         if download_image:
-            buf = io.BytesIO()
-            fig.savefig(buf, format='png', transparent=transparent_bg)
-            buf.seek(0)
+            cle_figure = (file_digest(uploaded_file), time_col, wind_speed_col, wind_dir_col, kmh, titre_on, nsector, bins)
             st.download_button(
                 label="Télécharger l'image",
-                data=buf,
-                file_name="rose_des_vents.png",
-                mime="image/png"
+                data=timed("encodage", deferred_export(fig, cle_figure, format_image, transparent=transparent_bg),
+                           "export de l'image"),
+                file_name=export_file_name("rose_des_vents", format_image),
+                mime=export_mime(format_image),
+                on_click="ignore"
             )
@@ -1,36 +1,38 @@
 
+import io
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from io import BytesIO
 from datetime import datetime
 
-st.set_page_config(page_title="Multi-Trace", layout="wide")
-
-# ------------------------------------------------------------
-# FONCTIONS
-# ------------------------------------------------------------
+from acoustics import query
+from acoustics.archive import Station, stations
+from acoustics.columnar import MULTITRACE_COLUMNS
+from acoustics.diskcache import store
+from acoustics.downsample import points_for_width
+from acoustics.export import FORMATS, deferred_export, export_file_name, export_mime
+from acoustics.loader import cache_stats, files_digest, footprint, load_campaign
+from acoustics.mapped import mapped_bytes
+from acoustics.multitrace import FIGSIZE, FIGURE_DPI, arrow_height, multitrace_figure
+from acoustics.profiling import stage, timed
+import background
+import session_data
 
-def calculate_mean_direction_and_sigma_theta(wind_directions):
-    wind_directions_rad = np.radians(wind_directions - 270)
-    mean_sin = np.mean(np.sin(wind_directions_rad))
-    mean_cos = np.mean(np.cos(wind_directions_rad))
-    mean_direction = np.degrees(np.arctan2(mean_sin, mean_cos))
-    sigma_theta = np.degrees(np.sqrt(-2 * np.log(np.sqrt(mean_sin**2 + mean_cos**2))))
-    return mean_direction, sigma_theta
+st.set_page_config(page_title="Multi-Trace", layout="wide")
 
+# Largeur (px) supposée du graphique interactif pour la réduction des séries
+INTERACTIVE_WIDTH_PX = 1800
 
-def compute_wind_vectors(df):
-    results = []
-    for minute, group in df.groupby(pd.Grouper(key="Start Time", freq="5Min")):
-        mean_speed = group["Wind Speed avg"].mean()
-        mean_dir, sigma = calculate_mean_direction_and_sigma_theta(group["Wind Dir. avg"])
-        results.append([minute, mean_speed, mean_dir, sigma])
-    return pd.DataFrame(results, columns=["Start Time", "MeanWindSpeed", "MeanWindDirection", "SigmaTheta"])
+# Résolution de l'image affichée : streamlit réduit à 1460 px de large (et
+# réencode) toute image plus large ; à 80 ppp la figure rognée fait environ
+# 1330 px et ses octets sont transmis tels quels. L'export garde sa résolution.
+DISPLAY_DPI = 80
 
+# Colonnes tracées (réduites en une seule lecture de la période)
+PLOT_COLUMNS = ["LAeq", "Wind Speed avg", "Amb. Humidity", "Amb. Temperature"]
 
+# Période affichée à l'ouverture d'une station de l'archive : les derniers jours
+ARCHIVE_DAYS = 7
 
 # ------------------------------------------------------------
 # INTERFACE PRINCIPALE
@@ -38,7 +40,18 @@ def compute_wind_vectors(df):
 
 st.title("📈 Multi-Trace")
 
-uploaded_file = st.file_uploader("Sélectionner un fichier Excel", type=["xlsx"])
+# Les stations de l'archive (voir acoustics.archive) s'ouvrent sur une période
+# quelconque : seuls les jours de la période affichée sont lus
+archivees = stations()
+station = None
+if archivees and st.radio("Source des données", ["Fichiers", "Archive des stations"], horizontal=True) != "Fichiers":
+    station = Station(st.selectbox("Station", archivees))
+    uploaded_files = None
+else:
+    # Plusieurs exports (un par jour, par exemple) sont fusionnés en une seule série ;
+    # les fichiers choisis restent disponibles pour les autres pages de la session
+    uploaded_files = session_data.file_uploader("Sélectionner un ou plusieurs fichiers Excel", type=["xlsx"],
+                                               accept_multiple_files=True)
 
 # ------------------------------------------------------------
 # SIDEBAR : OPTIONS D’AFFICHAGE
@@ -50,6 +63,73 @@ with st.sidebar.expander("⚙️ Options d’affichage"):
     dirlabel = st.checkbox("Afficher étiquettes direction", False)
     celcius = st.checkbox("Afficher Température", True)
     HR = st.checkbox("Afficher Humidité relative", True)
+    interactif = st.checkbox("Graphique interactif (zoom dans le navigateur)", False)
+
+# Fenêtres et intervalles proposés pour les indicateurs
+DUREES = {"15min": "15 min", "1h": "1 h"}
+
+with st.sidebar.expander("📊 Indicateurs acoustiques"):
+    leq_glissant = st.checkbox("Leq glissant", False)
+    fenetre = st.selectbox("Fenêtre du Leq glissant", list(DUREES), index=1, format_func=DUREES.get)
+    niveaux_stats = st.checkbox("Niveaux par intervalle (Leq, L10, L50, L90)", False)
+    intervalle = st.selectbox("Intervalle", list(DUREES), index=1, format_func=DUREES.get)
+
+
+# ------------------------------------------------------------
+# ÉTAPES DE CALCUL MISES EN CACHE
+# ------------------------------------------------------------
+# Chaque étape est mise en cache selon les seules entrées qu'elle utilise
+# (fichier, période, colonne, fenêtre...) : changer une option d'affichage
+# ne refait que les étapes qui en dépendent. `digest` identifie le fichier
+# ou le contenu de la station. `_df` est le tableau chargé ou la station de
+# l'archive, parcourue jour par jour sur la seule période affichée (voir
+# acoustics.query).
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def etendues(digest, _df):
+    # Minimum et maximum de chaque colonne (statistiques des fichiers pour
+    # une station : aucune mesure n'est lue)
+    return query.extents(_df, MULTITRACE_COLUMNS[1:])
+
+
+@st.cache_data(max_entries=16, show_spinner="Lecture de la période...")
+def traces_reduites(digest, debut, fin, n_buckets, _df):
+    # Points de la période affichée réduits en gardant les minimums et
+    # maximums de chaque intervalle (M4) ; l'unité du vent est appliquée après
+    return query.reduced(_df, debut, fin, PLOT_COLUMNS, n_buckets)
+
+
+@st.cache_data(max_entries=16, show_spinner="Calcul des vecteurs de vent...")
+def vecteurs_vent(digest, debut, fin, _df):
+    # Vecteurs de vent de la période affichée seulement, conservés aussi sur
+    # le disque pour les autres sessions et après un redémarrage
+    return store.cached("vent", (digest, str(debut), str(fin)), query.wind_vectors, _df, debut, fin)
+
+
+@st.cache_data(max_entries=16, show_spinner="Calcul du Leq glissant...")
+def trace_leq_glissant(digest, debut, fin, fenetre, n_buckets, _df):
+    # Calculé depuis une fenêtre avant le début de la période pour que le
+    # premier point affiché couvre une fenêtre complète, puis réduit (M4)
+    return query.rolling_reduced(_df, debut, fin, fenetre, n_buckets)
+
+
+@st.cache_data(max_entries=16, show_spinner="Calcul des niveaux par intervalle...")
+def niveaux_intervalles(digest, debut, fin, intervalle, _df):
+    # Intervalles complets, à partir du début de l'intervalle affiché
+    return query.interval_levels(_df, debut, fin, intervalle)
+
+
+def image_png(cle, construire):
+    # PNG affiché de la figure (rogné comme par st.pyplot). Calculé en
+    # arrière-plan : la file des travaux garde les images déjà tracées, et le
+    # cache sur disque celles des autres sessions et d'avant un redémarrage.
+    # Une figure déjà affichée avec la même clé n'est ni retracée ni réencodée
+    def encoder():
+        buffer = io.BytesIO()
+        construire().savefig(buffer, format="png", bbox_inches="tight", dpi=DISPLAY_DPI)
+        return buffer.getvalue()
+
+    return store.cached("figure", (FIGSIZE, DISPLAY_DPI) + cle, encoder)
 
 
 # ------------------------------------------------------------
@@ -61,28 +141,52 @@ with st.sidebar.expander("⚙️ Options d’affichage"):
 # ------------------------------------------------------------
 # SI FICHIER CHARGÉ
 # ------------------------------------------------------------
-if uploaded_file:
-
-    df = pd.read_excel(uploaded_file)
-    df["Start Time"] = pd.to_datetime(df["Start Time"], errors="coerce")
-    df = df.dropna(subset=["Start Time"])
-
-    # Vecteurs de vent
-    results_df = compute_wind_vectors(df)
+if uploaded_files or station is not None:
+
+    if station is not None:
+        # Rien n'est chargé : les étapes de calcul lisent dans l'archive les
+        # seuls jours de la période affichée. L'empreinte change à chaque
+        # ajout de mesures à la station.
+        digest = station.digest()
+        df = station
+        st.sidebar.caption(f"Archive : station {station.name}, {len(station.days())} jour(s) ; "
+                           "seule la période affichée est lue")
+    else:
+        digest = files_digest(uploaded_files)
+        # Tableau compact indexé par date-heure triée : une période se sélectionne
+        # par recherche dichotomique (voir time_window) sans parcourir tout le
+        # fichier. Partagé sans copie entre les exécutions : ne pas le modifier.
+        # Lecture hors du fil du script : la page reste réactive pendant le
+        # parsage d'un gros classeur
+        with stage("lecture", "données indexées"):
+            df = background.run("multitrace-lecture", ("mesures", digest), load_campaign,
+                                uploaded_files, MULTITRACE_COLUMNS, label="Lecture des fichiers...")
+        stats = cache_stats()
+        st.sidebar.caption(f"Cache des fichiers : {stats['hits']} réutilisation(s), {stats['misses']} lecture(s)")
+        fusion = df.attrs.get("fusion")
+        if fusion:
+            st.sidebar.caption(f"{fusion['fichiers']} fichiers fusionnés : {fusion['mesures ignorées']} mesure(s) "
+                               f"en double ignorée(s), {fusion['interruptions']} interruption(s)")
+        # Le tableau est partagé par les sessions qui affichent le même fichier :
+        # la mémoire d'une session est celle des fichiers qu'elle est seule à ouvrir.
+        # Ses colonnes sont projetées depuis le disque (voir acoustics.mapped) :
+        # une seule copie, dans le cache de pages du système, pour tous les processus
+        taille, par_ligne = footprint(df)
+        projete = mapped_bytes(df)
+        st.sidebar.caption(f"Mémoire : {taille / 1024**2:.1f} Mo pour les données chargées ({par_ligne:.0f} o/ligne), "
+                           f"dont {projete / 1024**2:.1f} Mo projetés depuis le disque ; "
+                           f"{stats['bytes'] / 1024**2:.1f} Mo non projetés pour l'ensemble des fichiers en cache")
 
     # VALEURS AUTOMATIQUES POUR INFO
-    laeq_min_auto = float(df["LAeq"].min())
-    laeq_max_auto = float(df["LAeq"].max())
+    bornes = etendues(digest, df)
+    laeq_min_auto, laeq_max_auto = bornes["LAeq"]
 
-    wind_series = df["Wind Speed avg"] * 3.6 if kmh else df["Wind Speed avg"]
-    wind_min_auto = float(wind_series.min())
-    wind_max_auto = float(wind_series.max())
+    facteur_vent = 3.6 if kmh else 1
+    wind_min_auto, wind_max_auto = (v * facteur_vent for v in bornes["Wind Speed avg"])
 
-    hr_min_auto = float(df["Amb. Humidity"].min())
-    hr_max_auto = float(df["Amb. Humidity"].max())
+    hr_min_auto, hr_max_auto = bornes["Amb. Humidity"]
 
-    temp_min_auto = float(df["Amb. Temperature"].min())
-    temp_max_auto = float(df["Amb. Temperature"].max())
+    temp_min_auto, temp_max_auto = bornes["Amb. Temperature"]
 
 
     # ------------------------------------------------------------
@@ -90,18 +194,21 @@ if uploaded_file:
     # ------------------------------------------------------------
     with st.sidebar.expander("🕒 Période d’affichage"):
 
-        debut_global = df["Start Time"].min()
-        fin_global = df["Start Time"].max()
+        debut_global, fin_global = query.span(df)
+        # Une station de l'archive s'ouvre sur ses derniers jours
+        debut_defaut = debut_global
+        if station is not None:
+            debut_defaut = max(debut_global, (fin_global - pd.Timedelta(days=ARCHIVE_DAYS)).ceil("D"))
 
         reset_time = st.button("🔄 Réinitialiser période d'affichage")
 
         if reset_time:
-            date_debut = debut_global
+            date_debut = debut_defaut
             date_fin = fin_global
         else:
             date_debut = st.datetime_input(
                 "Date-heure début",
-                value=debut_global,
+                value=debut_defaut,
                 min_value=debut_global,
                 max_value=fin_global
             )
@@ -115,7 +222,7 @@ if uploaded_file:
 
         if date_debut >= date_fin:
             st.warning("⚠️ La date de début doit être antérieure à la date de fin.")
-            date_debut = debut_global
+            date_debut = debut_defaut
             date_fin = fin_global
 
 
@@ -202,97 +309,146 @@ if uploaded_file:
     # ------------------------------------------------------------
     # GRAPHIQUE
     # ------------------------------------------------------------
-    fig, ax1 = plt.subplots(figsize=(18, 10))
-    ax1.grid(True)
-
-    # LAeq
-    ax1.plot(df["Start Time"], df["LAeq"], color="C0")
-    ax1.set_ylabel("LAeq", color="C0")
-    ax1.tick_params(axis="x", rotation=55)
-    ax1.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d %H:%M:%S"))
-    ax1.set_ylim(laeq_min, laeq_max)
-    ax1.set_title(titre_graphique)
-
-    ax1.set_xlim(date_debut, date_fin)
-
-    # Vent
-    if wind:
-        ax2 = ax1.twinx()
-        if kmh:
-            ax2.plot(df["Start Time"], df["Wind Speed avg"] * 3.6, color="C1")
-            ax2.set_ylabel("Vent vitesse (km/h)", color="C1")
-        else:
-            ax2.plot(df["Start Time"], df["Wind Speed avg"], color="C1")
-            ax2.set_ylabel("Vent vitesse (m/s)", color="C1")
-        ax2.set_ylim(wind_min, wind_max)
-
-    # HR
-    if HR:
-        ax3 = ax1.twinx()
-        ax3.spines["right"].set_position(("outward", 40))
-        ax3.plot(df["Start Time"], df["Amb. Humidity"], color="C2")
-        ax3.set_ylabel("%HR", color="C2")
-        ax3.set_ylim(hr_min, hr_max)
-
-    # Température
-    if celcius:
-        ax4 = ax1.twinx()
-        ax4.spines["right"].set_position(("outward", 100))
-        ax4.plot(df["Start Time"], df["Amb. Temperature"], color="C4")
-        ax4.set_ylabel("Température (°C)", color="C4")
-        ax4.set_ylim(temp_min, temp_max)
-
-    # Direction du vent
-    if direction:
-        results_df["row"] = results_df.index
-        ax_top = ax1.twiny()
-
-        wind_rad = np.radians(results_df["MeanWindDirection"])
-
-        y_arrow = laeq_max - (laeq_max - laeq_min) * 0.05
-
-        ax_top.quiver(
-            results_df["row"],
-            y_arrow,
-            np.cos(wind_rad),
-            np.sin(-wind_rad),
-            scale_units="xy",
-            scale=1,
-            width=0.003
+
+    debut, fin = pd.Timestamp(date_debut), pd.Timestamp(date_fin)
+
+    # Environ 2 points par colonne de pixels de la figure ; en mode
+    # interactif, densité doublée pour garder le détail en zoomant
+    if interactif:
+        n_buckets = points_for_width(INTERACTIVE_WIDTH_PX, points_per_px=4)
+    else:
+        n_buckets = points_for_width(FIGSIZE[0] * FIGURE_DPI)
+
+    with stage("agrégation", "traces réduites"):
+        reduites = traces_reduites(digest, debut, fin, n_buckets, df)
+
+    def trace(col, factor=1):
+        times, values = reduites[col]
+        return times, values * factor
+
+    with stage("agrégation", "compute_wind_vectors"):
+        results_df = vecteurs_vent(digest, debut, fin, df) if direction else None
+    y_arrow = arrow_height(laeq_min, laeq_max)
+
+    # Traces ajoutées sur l'axe LAeq : (dates, niveaux, nom, couleur, en escalier)
+    superpositions = []
+    if leq_glissant:
+        with stage("agrégation", f"Leq glissant {fenetre}"):
+            times, values = trace_leq_glissant(digest, debut, fin, fenetre, n_buckets, df)
+        superpositions.append((times, values, f"Leq glissant {DUREES[fenetre]}", "C3", False))
+
+    indicateurs = None
+    if niveaux_stats:
+        with stage("agrégation", f"niveaux par intervalle {intervalle}"):
+            indicateurs = niveaux_intervalles(digest, debut, fin, intervalle, df)
+        for col, color in (("L10", "C5"), ("L50", "C8"), ("L90", "C7")):
+            superpositions.append((indicateurs.index, indicateurs[col].to_numpy(),
+                                   f"{col} ({DUREES[intervalle]})", color, True))
+
+    if interactif:
+        # Les séries sont envoyées une fois au navigateur, qui gère ensuite
+        # zoom et déplacement ; densité doublée pour garder le détail en zoomant
+        from acoustics.interactive import multitrace_chart, series_frame
+
+        with stage("rendu", "graphique interactif"):
+            def serie(col, title, color, domain, factor=1):
+                return {"data": series_frame(*trace(col, factor)), "title": title,
+                        "color": color, "domain": domain}
+
+            others = []
+            if wind:
+                others.append(serie("Wind Speed avg", f"Vent vitesse ({'km/h' if kmh else 'm/s'})", "C1",
+                                    (wind_min, wind_max), 3.6 if kmh else 1))
+            if HR:
+                others.append(serie("Amb. Humidity", "%HR", "C2", (hr_min, hr_max)))
+            if celcius:
+                others.append(serie("Amb. Temperature", "Température (°C)", "C4", (temp_min, temp_max)))
+
+            overlays = [{"data": series_frame(times, values), "title": title, "color": color, "step": step}
+                        for times, values, title, color, step in superpositions]
+
+            chart = multitrace_chart(
+                serie("LAeq", "LAeq", "C0", (laeq_min, laeq_max)),
+                others,
+                titre_graphique,
+                (date_debut, date_fin),
+                vectors=results_df,
+                arrow_y=y_arrow,
+                labels=dirlabel,
+                overlays=overlays,
+            )
+        with stage("encodage", "st.altair_chart"):
+            st.altair_chart(chart, width="stretch")
+        st.sidebar.caption("Mode interactif : l'image s'exporte depuis le menu « ⋯ » du graphique.")
+
+    else:
+        # Tout ce qui détermine le contenu de la figure : une image déjà
+        # tracée ou encodée avec les mêmes paramètres est réutilisée
+        cle_figure = (
+            digest, str(debut), str(fin), titre_graphique,
+            wind, kmh, direction, dirlabel, celcius, HR,
+            leq_glissant, fenetre, niveaux_stats, intervalle,
+            laeq_min, laeq_max, wind_min, wind_max, hr_min, hr_max, temp_min, temp_max,
         )
 
-        if dirlabel:
-            y_label = y_arrow - (laeq_max - laeq_min) * 0.03
-            for _, row in results_df.iterrows():
-                ax_top.text(
-                    row["row"],
-                    y_label,
-                    f'{row["MeanWindDirection"]+270:.1f}\n({row["SigmaTheta"]:.1f})',
-                    color="red",
-                    ha="center",
-                    fontsize=8
-                )
+        # Traces lues dans les caches de la page par le fil du script : la
+        # figure peut ensuite être construite dans un autre fil
+        colonnes = ["LAeq"] + [col for col, affichee in (("Wind Speed avg", wind), ("Amb. Humidity", HR),
+                                                         ("Amb. Temperature", celcius)) if affichee]
+        traces = {col: trace(col) for col in colonnes}
+
+        # La figure n'est construite qu'au besoin : affichage d'une clé
+        # nouvelle ou export d'un format pas encore encodé. matplotlib n'est
+        # chargé qu'au premier tracé : ni le mode interactif ni une image
+        # déjà en cache n'en ont besoin
+        def construire_figure():
+            return multitrace_figure(
+                traces,
+                titre_graphique,
+                (date_debut, date_fin),
+                {"LAeq": (laeq_min, laeq_max), "Wind Speed avg": (wind_min, wind_max),
+                 "Amb. Humidity": (hr_min, hr_max), "Amb. Temperature": (temp_min, temp_max)},
+                kmh=kmh,
+                vectors=results_df,
+                labels=dirlabel,
+                overlays=superpositions,
+            )
 
-    st.pyplot(fig)
+        with stage("rendu", "figure (tracé et PNG, en arrière-plan)"):
+            png = background.run("multitrace-image", cle_figure, image_png, cle_figure, construire_figure,
+                                 label="Tracé de la figure...")
+            st.image(png, width="stretch")
 
-    # ------------------------------------------------------------
-    # Téléchargement PNG (toujours visible)
-    # ------------------------------------------------------------
+        # ------------------------------------------------------------
+        # Téléchargement de l'image (toujours visible)
+        # ------------------------------------------------------------
 
-    from zoneinfo import ZoneInfo
-    
-    # ...
-    buffer = BytesIO()
-    fig.savefig(buffer, format="png")
-    
-    # Utiliser l'heure du Québec (EST/EDT)
-    now_local = datetime.now(ZoneInfo("America/Toronto"))
-    st.sidebar.download_button(
-        label="📥 Télécharger l’image (.png)",
-        data=buffer.getvalue(),
-        file_name=f"traces_{now_local.strftime('%Y-%m-%d_%Hh%Mm%Ss')}.png",
-        mime="image/png"
-    )
+        from zoneinfo import ZoneInfo
 
+        format_image = st.sidebar.selectbox("Format de l'image", list(FORMATS))
 
+        # Utiliser l'heure du Québec (EST/EDT)
+        now_local = datetime.now(ZoneInfo("America/Toronto"))
+        # L'image n'est encodée qu'au clic sur le bouton (export différé)
+        st.sidebar.download_button(
+            label=f"📥 Télécharger l’image (.{FORMATS[format_image][0]})",
+            data=timed("encodage", deferred_export(construire_figure, cle_figure, format_image), "export de l'image"),
+            file_name=export_file_name(f"traces_{now_local.strftime('%Y-%m-%d_%Hh%Mm%Ss')}", format_image),
+            mime=export_mime(format_image),
+            on_click="ignore"
+        )
+
+    # ------------------------------------------------------------
+    # TABLEAU DES NIVEAUX PAR INTERVALLE
+    # ------------------------------------------------------------
+    if indicateurs is not None:
+        with st.expander(f"📊 Niveaux par intervalle de {DUREES[intervalle]}"):
+            st.dataframe(indicateurs.style.format("{:.1f}", subset=["Leq", "L10", "L50", "L90"]))
+            st.download_button(
+                label="📥 Télécharger le tableau (.csv)",
+                data=indicateurs.to_csv().encode("utf-8"),
+                file_name=f"niveaux_{intervalle}.csv",
+                mime="text/csv",
+                on_click="ignore"
+            )
 
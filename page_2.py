@@ -5,8 +5,13 @@ Created on Thu Aug 28 09:56:25 2025
 @author: hotju02
 """
 
+import re
+
+import numpy as np
 import streamlit as st
 
+from acoustics.decibels import db_difference, db_mean, db_sum, leq
+
 # =============================================================================
 st.markdown("# Calculatrice de décibels")
 st.sidebar.markdown("# Calculatrice de décibels")
@@ -251,6 +256,66 @@ html_code = """
 st.components.v1.html(html_code, height=600, width=300)
 
 
+# =============================================================================
+# Combinaison d'une liste de niveaux (collée ou lue dans un fichier)
+# =============================================================================
+st.markdown("## Combiner une liste de niveaux")
+
+
+def lire_niveaux(texte):
+    # Séparateurs : retours à la ligne, espaces, tabulations ou points-virgules ;
+    # la virgule décimale est acceptée
+    valeurs = [v.replace(",", ".") for v in re.split(r"[\s;]+", texte) if v.strip()]
+    niveaux = np.array([float(v) for v in valeurs if re.fullmatch(r"[-+]?\d*\.?\d+(e[-+]?\d+)?", v, re.I)])
+    return niveaux, len(valeurs) - len(niveaux)
+
+
+source = st.radio("Source des niveaux", ["Coller une liste", "Colonne d'un fichier"], horizontal=True)
+niveaux = np.array([])
+durees = None
+
+if source == "Coller une liste":
+    texte = st.text_area("Niveaux (dB), un par ligne ou séparés par des espaces ou des points-virgules", height=150)
+    niveaux, ignores = lire_niveaux(texte)
+    if ignores:
+        st.warning(f"{ignores} valeur(s) non numérique(s) ignorée(s).")
+else:
+    fichier = st.file_uploader("Fichier CSV ou Excel", type=["csv", "xlsx"], key="fichier_niveaux")
+    if fichier:
+        # pandas n'est chargé que pour lire un fichier
+        from acoustics.loader import load_table
+
+        df = load_table(fichier)
+        colonnes = list(df.select_dtypes("number").columns)
+        if not colonnes:
+            st.error("Le fichier ne contient aucune colonne numérique.")
+        else:
+            colonne = st.selectbox("Colonne des niveaux (dB)", colonnes)
+            niveaux = df[colonne].to_numpy(dtype=float)
+            colonne_duree = st.selectbox("Colonne des durées (pondération du Leq)", ["Aucune"] + colonnes)
+            if colonne_duree != "Aucune":
+                durees = df[colonne_duree].to_numpy(dtype=float)
+
+fond = st.number_input("Niveau à soustraire du total (bruit de fond, dB) — facultatif", value=None)
+
+n = int(np.count_nonzero(~np.isnan(niveaux)))
+if n:
+    total = db_sum(niveaux)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Somme énergétique", f"{total:.2f} dB")
+    if durees is not None:
+        col2.metric("Leq pondéré par les durées", f"{leq(niveaux, durees):.2f} dB")
+    else:
+        col2.metric("Moyenne énergétique", f"{db_mean(niveaux):.2f} dB")
+    col3.metric("Nombre de niveaux", n)
+    if fond is not None:
+        reste = db_difference(total, fond)
+        if np.isnan(reste):
+            st.error("Le niveau à soustraire dépasse la somme des niveaux.")
+        else:
+            st.metric("Somme moins le niveau soustrait", f"{reste:.2f} dB")
+
+
 
 
 
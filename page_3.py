@@ -5,10 +5,20 @@ Created on Thu Aug 28 09:59:43 2025
 @author: hotju02
 """
 
+from datetime import datetime, time
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import openpyxl
+
+from acoustics import query
+from acoustics.archive import Station, stations
+from acoustics.batch import batch_lden, station_name
+from acoustics.diskcache import store
+from acoustics.lden import lden_streaming
+from acoustics.loader import cache_stats, columnar_file, file_digest, load_table
+from acoustics.profiling import stage
+import background
+import session_data
 
 #t.title("This is the title page 3")
 
@@ -23,55 +33,69 @@ Votre fichier doit contenir deux colonnes: une pour l'heure (format hh:mm:ss) et
 """)
 
 # Section pour le téléchargement du fichier
-uploaded_file = st.file_uploader("Veuillez choisir un fichier Excel", type=["xlsx", "xls"])
+# Le fichier choisi reste disponible pour les autres pages de la session
+uploaded_file = session_data.file_uploader("Veuillez choisir un fichier Excel", type=["xlsx", "xls"])
+
+# Nombre de lignes affichées dans l'aperçu ; le calcul, lui, lit tout le fichier
+APERCU_LIGNES = 1000
+
+
+def calcul_lden(digest, uploaded_file):
+    # Exécuté en arrière-plan. Le fichier est lu par morceaux : seules les
+    # sommes d'énergie par période sont gardées en mémoire. Si une page l'a
+    # déjà converti, la conversion Parquet partagée est lue par lots au lieu
+    # de reparser le classeur. Le résultat est réutilisé tant que le contenu
+    # du fichier (digest) ne change pas, y compris par les autres sessions et
+    # après un redémarrage (cache sur disque).
+    def calcul():
+        converti = columnar_file(uploaded_file)
+        if converti is not None:
+            return lden_streaming(converti)
+        return lden_streaming(uploaded_file, name=uploaded_file.name)
+
+    return store.cached("lden", digest, calcul)
+
 
 if uploaded_file is not None:
     try:
-        # Lecture du fichier Excel en ignorant la première ligne
-        df = pd.read_excel(uploaded_file, header=0)
-        
+        # Lecture des premières lignes du fichier Excel pour l'aperçu
+        with stage("lecture", "aperçu"):
+            # Premier parsage du classeur hors du fil du script : la page
+            # reste réactive pendant la lecture d'un gros fichier
+            df = background.run("lden-apercu", ("aperçu", file_digest(uploaded_file)), load_table,
+                                uploaded_file, header=0, nrows=APERCU_LIGNES, label="Lecture du fichier...")
         # Renommer les colonnes pour la clarté si nécessaire
+        # (rename plutôt que df.columns.values : l'index des colonnes est
+        # partagé avec le tableau conservé en cache)
         ##df.columns = ["Heure", "LAeq"]
-        df.columns.values[0] = 'Heure'
-        df.columns.values[1] = 'LAeq'
+        df = df.rename(columns={df.columns[0]: 'Heure', df.columns[1]: 'LAeq'})
         
-        st.write("Aperçu des données chargées:")
+        st.write(f"Aperçu des données chargées ({APERCU_LIGNES} premières lignes) :")
         st.dataframe(df)#.head()
 
         
         # Vérification des colonnes nécessaires
         if "Heure" in df.columns and "LAeq" in df.columns:
-            # Assurer que la colonne 'Heure' est de type datetime pour extraire les heures
-            df["Heure"] = pd.to_datetime(df["Heure"], format="%H:%M:%S").dt.hour
-
             # Séparer les données en périodes Jours/Soir/Nuit
             # Jour: 7h à 19h
             # Soir: 19h à 23h
             # Nuit: 23h à 7h
-            
-            laeq_jour = df[(df["Heure"] >= 7) & (df["Heure"] < 19)]["LAeq"]
-            laeq_soir = df[(df["Heure"] >= 19) & (df["Heure"] < 23)]["LAeq"]
-            laeq_nuit_1 = df[df["Heure"] >= 23]["LAeq"]
-            laeq_nuit_2 = df[df["Heure"] < 7]["LAeq"]
-            laeq_nuit = pd.concat([laeq_nuit_1, laeq_nuit_2])
-            
-            # Calcul des niveaux LAeq moyens par période
-            L_jour = 10 * np.log10(np.mean(10**(laeq_jour/10))) if not laeq_jour.empty else -np.inf
-            L_soir = 10 * np.log10(np.mean(10**(laeq_soir/10))) if not laeq_soir.empty else -np.inf
-            L_nuit = 10 * np.log10(np.mean(10**(laeq_nuit/10))) if not laeq_nuit.empty else -np.inf
-
+            #
             # L'indice acoustique Lden est un moyenne énergétique pondérée sur une période de 24h
             # Période de jour : 12h
             # Période de soir : 4h (avec une pénalité de +5 dB)
             # Période de nuit : 8h (avec une pénalité de +10 dB)
-            
-            num_j = 12 * 10**(L_jour/10)
-            num_s = 4 * 10**((L_soir+5)/10)
-            num_n = 8 * 10**((L_nuit+10)/10)
+            with stage("agrégation", "Lden"):
+                # Hors du fil du script, comme l'aperçu : la page reste
+                # réactive pendant la lecture d'un gros classeur, et un calcul
+                # devenu inutile (autre fichier) est annulé entre deux morceaux
+                digest = file_digest(uploaded_file)
+                resultat = background.run("lden-calcul", ("lden", digest), calcul_lden, digest, uploaded_file,
+                                          label="Calcul du Lden...")
+            lden = resultat["Lden"]
 
             # Calcul final du Lden
-            if (num_j + num_s + num_n) > 0:
-                lden = 10 * np.log10((num_j + num_s + num_n) / 24)
+            if np.isfinite(lden):
                 st.subheader("Résultat du calcul Lden")
                 st.metric(label="Lden", value=f"{lden:.2f} dB")
             else:
@@ -83,3 +107,102 @@ if uploaded_file is not None:
     except Exception as e:
         st.error(f"Une erreur s'est produite lors du traitement du fichier : {e}")
 
+    stats = cache_stats()
+    st.sidebar.caption(f"Cache des fichiers : {stats['hits']} réutilisation(s), {stats['misses']} lecture(s)")
+
+
+# ------------------------------------------------------------
+# CALCUL EN LOT : PLUSIEURS STATIONS ET PLUSIEURS JOURS
+# ------------------------------------------------------------
+st.markdown("## Calcul en lot par jour et par station")
+st.write("""
+Chaque fichier doit contenir une colonne date-heure ("Start Time") et une colonne LAeq ; à défaut, les deux premières colonnes sont utilisées. 
+La station est déduite du nom du fichier : les fichiers nommés « STATION_xxx » sont regroupés sous la même station.
+""")
+
+fichiers_lot = st.file_uploader("Fichiers des stations", type=["xlsx", "csv"], accept_multiple_files=True, key="fichiers_lot")
+
+
+def calcul_lot(digests, fichiers):
+    # Les fichiers sont traités en parallèle, un processus par cœur ; le
+    # tableau est conservé sur le disque pour les autres sessions
+    return store.cached("lden-lot", digests, lambda: batch_lden(
+        [(station_name(f.name), f.name, f.getvalue()) for f in fichiers]))
+
+
+if fichiers_lot:
+    digests = tuple(file_digest(f) for f in fichiers_lot)
+    if st.button("Calculer les niveaux par jour"):
+        st.session_state["lot_digests"] = digests
+
+    if st.session_state.get("lot_digests") == digests:
+        try:
+            with stage("agrégation", "calcul en lot"):
+                # Calcul hors du fil du script, réutilisé tant que les
+                # fichiers ne changent pas
+                tableau = background.run("lden-lot", ("lot", digests), calcul_lot, digests, fichiers_lot,
+                                         label="Calcul des niveaux par jour...")
+            st.dataframe(tableau.style.format(precision=2))
+            for station, n in tableau.attrs.get("mesures en double", {}).items():
+                st.caption(f"{station} : {n} mesure(s) en double entre fichiers qui se chevauchent, comptée(s) une fois")
+            st.download_button(
+                label="📥 Télécharger le tableau (.csv)",
+                data=tableau.to_csv(index=False).encode("utf-8"),
+                file_name="lden_par_jour.csv",
+                mime="text/csv"
+            )
+        except Exception as e:
+            st.error(f"Une erreur s'est produite lors du calcul en lot : {e}")
+
+
+# ------------------------------------------------------------
+# ARCHIVE DES STATIONS : LDEN SUR UNE PÉRIODE QUELCONQUE
+# ------------------------------------------------------------
+archivees = stations()
+
+
+def lden_archive(station, digest, debut, fin):
+    # La station est lue jour par jour, sur la seule période choisie ; le
+    # résultat est conservé sur le disque tant que la station ne change pas
+    return store.cached("lden-archive", (digest, str(debut), str(fin)), query.lden, station, debut, fin)
+
+
+if archivees:
+    st.markdown("## Lden d'une station de l'archive")
+    st.write("""
+Les niveaux sont calculés sur la période choisie, jour par jour : seuls les jours de la période sont lus dans l'archive.
+""")
+    station = Station(st.selectbox("Station", archivees, key="station_archive"))
+    etendue = station.span()
+    if etendue is not None:
+        premier, dernier = (t.date() for t in etendue)
+        periode = st.date_input("Période", value=(premier, dernier), min_value=premier, max_value=dernier,
+                                key="periode_archive")
+        if len(periode) == 2:
+            debut, fin = datetime.combine(periode[0], time.min), datetime.combine(periode[1], time.max)
+            digest = station.digest()
+            cle = (station.name, digest, str(debut), str(fin))
+            if st.button("Calculer le Lden de la période"):
+                st.session_state["archive_cle"] = cle
+
+            if st.session_state.get("archive_cle") == cle:
+                try:
+                    with stage("agrégation", "Lden de l'archive"):
+                        resultat, tableau = background.run("lden-archive", ("archive",) + cle, lden_archive,
+                                                           station, digest, debut, fin,
+                                                           label="Lecture de l'archive...")
+                    if np.isfinite(resultat["Lden"]):
+                        st.subheader(f"Lden du {periode[0]} au {periode[1]}")
+                        st.metric(label="Lden", value=f"{resultat['Lden']:.2f} dB")
+                    else:
+                        st.warning("Impossible de calculer le Lden : la période ne contient aucune mesure.")
+                    st.dataframe(tableau.style.format(precision=2))
+                    st.download_button(
+                        label="📥 Télécharger le tableau (.csv)",
+                        data=tableau.to_csv(index=False).encode("utf-8"),
+                        file_name=f"lden_{station.name}_{periode[0]}_{periode[1]}.csv",
+                        mime="text/csv",
+                        key="telecharger_archive"
+                    )
+                except Exception as e:
+                    st.error(f"Une erreur s'est produite lors de la lecture de l'archive : {e}")
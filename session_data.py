@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Jeu de données partagé par les pages d'une session.
+
+Un fichier téléversé sur une page est conservé dans st.session_state : les
+autres pages l'utilisent sans nouveau téléversement, et les tableaux lus
+sont ceux du cache de acoustics.loader, lus une seule fois et partagés entre
+les sessions qui ouvrent le même fichier. Quand plus aucune session n'utilise
+un fichier (session expirée ou autre fichier choisi), ses tableaux sont
+retirés du cache.
+"""
+
+import threading
+import weakref
+from collections import Counter
+
+import streamlit as st
+
+from acoustics.loader import file_digest, release
+
+STORE_KEY = "jeu_de_donnees"
+
+# Nombre de sessions qui utilisent chaque fichier, toutes sessions confondues
+_users = Counter()
+_lock = threading.Lock()
+
+
+def _release(digests):
+    with _lock:
+        for digest in digests:
+            _users[digest] -= 1
+            if _users[digest] <= 0:
+                del _users[digest]
+                release(digest)
+
+
+class Dataset:
+    """Fichiers téléversés de la session ; libérés quand l'objet disparaît."""
+
+    def __init__(self, files):
+        self.files = list(files)
+        self.digests = [file_digest(f) for f in self.files]
+        with _lock:
+            _users.update(set(self.digests))
+        # Appelé quand la session est fermée ou que le jeu est remplacé
+        weakref.finalize(self, _release, set(self.digests))
+
+    @property
+    def names(self):
+        return [f.name for f in self.files]
+
+    def accepts(self, types, multiple):
+        return ((multiple or len(self.files) == 1)
+                and all(name.lower().rsplit(".", 1)[-1] in types for name in self.names))
+
+
+def current():
+    """Jeu de données de la session, ou None."""
+    return st.session_state.get(STORE_KEY)
+
+
+def clear():
+    st.session_state.pop(STORE_KEY, None)
+
+
+def file_uploader(label, type, accept_multiple_files=False, key=None):
+    """
+    Remplace st.file_uploader : retourne le jeu de données de la session s'il
+    convient à la page (extensions `type`, un seul fichier sauf si
+    `accept_multiple_files`), sinon affiche le champ de téléversement et
+    conserve les fichiers choisis pour les autres pages.
+
+    Avec `accept_multiple_files`, un champ reste affiché sous les fichiers de
+    la session : les fichiers ajoutés (un export par jour, par exemple) sont
+    joints au jeu de données au lieu de le remplacer.
+    """
+    dataset = current()
+    if dataset is not None and dataset.accepts(type, accept_multiple_files):
+        col_nom, col_bouton = st.columns([4, 1], vertical_alignment="center")
+        col_nom.info("📂 Données de la session : " + ", ".join(dataset.names))
+        if col_bouton.button("Changer de fichier", key=f"changer_{key or label}"):
+            clear()
+            st.rerun()
+        if not accept_multiple_files:
+            return dataset.files[0]
+        added = st.file_uploader("Ajouter des fichiers", type=type, accept_multiple_files=True,
+                                 key=f"ajouter_{key or label}")
+        # Le champ renvoie ses fichiers à chaque exécution : seuls ceux dont le
+        # contenu n'est pas déjà dans le jeu de données y sont ajoutés
+        new = {}
+        for f in added or []:
+            digest = file_digest(f)
+            if digest not in dataset.digests:
+                new.setdefault(digest, f)
+        if new:
+            dataset = Dataset(dataset.files + list(new.values()))
+            st.session_state[STORE_KEY] = dataset
+            st.rerun()
+        return dataset.files
+
+    uploaded = st.file_uploader(label, type=type, accept_multiple_files=accept_multiple_files, key=key)
+    files = uploaded if accept_multiple_files else [uploaded] if uploaded is not None else []
+    if files:
+        st.session_state[STORE_KEY] = Dataset(files)
+    return uploaded
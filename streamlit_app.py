@@ -6,9 +6,8 @@ import streamlit as st
 ##)
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import time
+
+import diagnostic
 
 
 # Define the pages
@@ -21,5 +20,5 @@ page_5 = st.Page("page5.py", title="Multitraces")
 # Set up navigation
 pg = st.navigation([main_page, page_2, page_3,page_4,page_5])
 
-# Run the selected page
-pg.run()
+# Run the selected page (avec diagnostic des performances si ?profil=1)
+diagnostic.run(pg)
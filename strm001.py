@@ -6,9 +6,8 @@ Created on Thu Aug 28 09:25:20 2025
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import time
+
+import diagnostic
 
 
 # Define the pages
@@ -21,8 +20,8 @@ page_5 = st.Page("page5.py", title="Multitraces")
 # Set up navigation
 pg = st.navigation([main_page, page_2, page_3,page_4,page_5])
 
-# Run the selected page
-pg.run()
+# Run the selected page (avec diagnostic des performances si ?profil=1)
+diagnostic.run(pg)
 
 
 # =============================================================================
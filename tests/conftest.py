@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration commune des tests : le paquet acoustics est importé depuis la
+racine du dépôt, et les fichiers convertis sont écrits dans un répertoire
+temporaire plutôt que dans le cache de l'utilisateur.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("ACOUSTICS_CACHE_DIR", tempfile.mkdtemp(prefix="acoustics-tests-"))
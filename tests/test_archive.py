@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Archive des stations : ajout de mesures jour par jour, et calculs sur une
+période identiques à ceux du même tableau chargé en mémoire.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics import query
+from acoustics.archive import Station, stations
+from acoustics.loader import compact_frame
+
+COLUMNS = ["LAeq", "Wind Speed avg", "Wind Dir. avg", "Amb. Humidity"]
+
+
+@pytest.fixture
+def export():
+    rng = np.random.default_rng(3)
+    times = pd.date_range("2024-07-01 06:00", "2024-07-03 18:00", freq="10s")
+    # Trou de 3 h au milieu d'une journée
+    times = times[(times < "2024-07-02 10:00") | (times >= "2024-07-02 13:00")]
+    n = len(times)
+    df = pd.DataFrame({
+        "Start Time": times,
+        "LAeq": np.round(50 + 6 * rng.standard_normal(n), 1),
+        "Wind Speed avg": rng.gamma(2.0, 1.5, n),
+        "Wind Dir. avg": (180 + rng.normal(0, 50, n)) % 360,
+        "Amb. Humidity": rng.uniform(30, 90, n),
+        "Remarque": "ok",
+    })
+    df.loc[rng.random(n) < 0.03, "LAeq"] = np.nan
+    return df
+
+
+@pytest.fixture
+def station(tmp_path, export):
+    station = Station("S1", root=tmp_path)
+    written = station.append(export)
+    assert written == list(pd.to_datetime(["2024-07-01", "2024-07-02", "2024-07-03"]))
+    return station
+
+
+@pytest.fixture
+def memory(export):
+    return compact_frame(export[["Start Time"] + COLUMNS])
+
+
+def test_days_columns_and_span(tmp_path, station, export):
+    assert stations(tmp_path) == ["S1"]
+    assert station.days("2024-07-02 12:00", "2024-07-02 14:00") == [pd.Timestamp("2024-07-02")]
+    # Colonne de texte non archivée
+    assert station.columns() == COLUMNS
+    assert station.span() == (export["Start Time"].iloc[0], export["Start Time"].iloc[-1])
+
+
+def test_append_is_idempotent(station, export):
+    before = {day: station.read_day(day) for day in station.days()}
+    digest = station.digest()
+    # Même export, puis une partie qui chevauche deux jours
+    station.append(export)
+    station.append(export[export["Start Time"].between("2024-07-01 20:00", "2024-07-02 04:00")])
+    for day in station.days():
+        pd.testing.assert_frame_equal(station.read_day(day), before[day])
+    assert station.digest() != digest  # fichiers réécrits
+
+
+def test_read_day_matches_memory(station, memory):
+    start, end = pd.Timestamp("2024-07-02 08:30"), pd.Timestamp("2024-07-02 15:00")
+    day = station.read_day(pd.Timestamp("2024-07-02"), start, end, ["LAeq", "Inconnue"])
+    expected = memory.loc[start:end, ["LAeq"]]
+    pd.testing.assert_frame_equal(day[["LAeq"]], expected, check_freq=False)
+    assert day["Inconnue"].isna().all()
+
+
+@pytest.mark.parametrize("start, end", [(None, None), ("2024-07-01 20:00", "2024-07-03 09:30")])
+def test_extents_match_memory(station, memory, start, end):
+    period = memory.loc[start:end]
+    expected = {col: (float(period[col].min()), float(period[col].max())) for col in COLUMNS}
+    assert station.extents(COLUMNS, start, end) == pytest.approx(expected)
+
+
+@pytest.fixture(params=[("2024-07-01 06:00", "2024-07-03 18:00"), ("2024-07-01 21:17", "2024-07-03 02:45")])
+def period(request):
+    return tuple(pd.Timestamp(t) for t in request.param)
+
+
+def test_reduced_matches_memory(station, memory, period):
+    archived = query.reduced(station, *period, ["LAeq", "Amb. Humidity"], 500)
+    loaded = query.reduced(memory, *period, ["LAeq", "Amb. Humidity"], 500)
+    # Mêmes intervalles de réduction : seul un intervalle coupé par minuit
+    # garde les extrêmes de chacune de ses deux parties (4 points de plus au plus)
+    midnights = len(station.days(*period)) - 1
+    for col in ("LAeq", "Amb. Humidity"):
+        times, values = archived[col]
+        assert set(loaded[col][0]) <= set(times)
+        assert len(loaded[col][0]) <= len(times) <= len(loaded[col][0]) + 4 * midnights
+        np.testing.assert_array_equal(values, memory.loc[times, col].to_numpy())
+
+
+def test_wind_vectors_match_memory(station, memory, period):
+    pd.testing.assert_frame_equal(query.wind_vectors(station, *period), query.wind_vectors(memory, *period),
+                                  check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_lden_matches_memory(station, memory, period):
+    archived, archived_days = query.lden(station, *period)
+    loaded, loaded_days = query.lden(memory, *period)
+    assert archived == pytest.approx(loaded)
+    pd.testing.assert_frame_equal(archived_days, loaded_days)
+
+
+def test_interval_levels_match_memory(station, memory, period):
+    pd.testing.assert_frame_equal(query.interval_levels(station, *period, "1h"),
+                                  query.interval_levels(memory, *period, "1h"))
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Niveaux par station et par jour (batch_lden), fichiers qui se chevauchent."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics.batch import batch_lden
+
+
+def _csv(tmp_path, name, times, laeq):
+    path = tmp_path / name
+    pd.DataFrame({"Start Time": times, "LAeq": laeq}).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def day(tmp_path):
+    # Une journée à 10 s (8640 mesures), coupée en deux fichiers, plus un
+    # troisième export qui chevauche les deux premiers
+    times = pd.date_range("2024-06-01", periods=8640, freq="10s")
+    laeq = np.random.default_rng(0).uniform(40, 70, len(times)).round(1)
+    return {
+        "a": _csv(tmp_path, "a.csv", times[:5000], laeq[:5000]),
+        "b": _csv(tmp_path, "b.csv", times[5000:], laeq[5000:]),
+        "c": _csv(tmp_path, "c.csv", times[4000:7000], laeq[4000:7000]),
+    }
+
+
+def test_overlapping_files_are_counted_once(day):
+    reference = batch_lden([("S", "a.csv", day["a"]), ("S", "b.csv", day["b"])], workers=1)
+    assert reference.attrs["mesures en double"] == {}
+    assert reference["Nb mesures"].tolist() == [8640]
+
+    table = batch_lden([("S", "c.csv", day["c"]), ("S", "a.csv", day["a"]), ("S", "b.csv", day["b"])], workers=2)
+    pd.testing.assert_frame_equal(table, reference)
+    assert table.attrs["mesures en double"] == {"S": 3000}
+
+
+def test_overlap_is_per_station(day):
+    table = batch_lden([("S", "a.csv", day["a"]), ("T", "c.csv", day["c"])], workers=1)
+    assert table["Nb mesures"].tolist() == [5000, 3000]
+    assert table.attrs["mesures en double"] == {}
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Leq pondéré par des durées manquantes ou non finies."""
+
+import numpy as np
+import pytest
+
+from acoustics.decibels import leq
+
+
+def test_leq_ignores_missing_weights():
+    assert leq([60, 70], [1, np.nan]) == pytest.approx(60)
+    assert leq([60, 70, 80], [1, np.inf, 1]) == pytest.approx(leq([60, 80], [1, 1]))
+
+
+def test_leq_without_any_weight_is_minus_infinity():
+    assert leq([60, 70], [np.nan, np.nan]) == -np.inf
+
+
+def test_leq_missing_weights_along_axis():
+    levels = np.array([[60.0, 70.0], [80.0, 90.0]])
+    weights = np.array([[1.0, np.nan], [2.0, 2.0]])
+    result = leq(levels, weights, axis=1)
+    assert result[0] == pytest.approx(60)
+    assert result[1] == pytest.approx(leq([80, 90]))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Cache de résultats sur disque : réutilisation, éviction et fichiers illisibles."""
+
+import os
+import time
+
+import numpy as np
+
+from acoustics.diskcache import DiskCache
+
+
+def _age(path, seconds):
+    # Date d'utilisation reculée : l'éviction suit la date de modification
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+
+
+def test_cached_computes_once_and_persists(tmp_path):
+    calls = []
+
+    def compute(x, factor=1):
+        calls.append(x)
+        return np.arange(x) * factor
+
+    cache = DiskCache(tmp_path)
+    first = cache.cached("calc", ("a", 3), compute, 3, factor=2)
+    second = cache.cached("calc", ("a", 3), compute, 3, factor=2)
+    # Autre processus ou redémarrage : nouvel objet, même répertoire
+    third = DiskCache(tmp_path).cached("calc", ("a", 3), compute, 3, factor=2)
+    assert calls == [3]
+    for value in (first, second, third):
+        np.testing.assert_array_equal(value, [0, 2, 4])
+    cache.cached("calc", ("a", 4), compute, 4)
+    cache.cached("autre", ("a", 3), compute, 3)
+    assert calls == [3, 4, 3]
+    assert cache.stats()["files"] == 3
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10**9)
+    payload = b"x" * 10_000
+    for i in range(3):
+        cache.put("r", i, payload)
+    for i, age in ((0, 300), (1, 100), (2, 200)):
+        _age(cache.path("r", i), age)
+    # Relire une entrée la marque comme utilisée
+    assert cache.get("r", 0) == payload
+    size = os.path.getsize(cache.path("r", 0))
+    cache.max_bytes = 3 * size
+    cache.put("r", 3, payload)
+    assert not cache.path("r", 2).exists()
+    assert all(cache.path("r", i).exists() for i in (0, 1, 3))
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_eviction_counts_parquet_and_mapped_directories(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=15_000)
+    (tmp_path / "t.cols").mkdir()
+    (tmp_path / "t.cols" / "c0.npy").write_bytes(b"x" * 8_000)
+    (tmp_path / "f.parquet").write_bytes(b"x" * 8_000)
+    _age(tmp_path / "t.cols", 100)
+    cache.added(tmp_path / "f.parquet")
+    assert not (tmp_path / "t.cols").exists()
+    assert (tmp_path / "f.parquet").exists()
+
+
+def test_directory_scanned_only_when_limit_is_crossed(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path, max_bytes=55_000)
+    scans = []
+    files = cache._files
+    monkeypatch.setattr(cache, "_files", lambda: scans.append(1) or files())
+    for i in range(5):
+        cache.put("r", i, b"x" * 10_000)
+    # Premier ajout : parcours du répertoire ; les suivants sont comptés
+    assert len(scans) == 1
+    # Sixième entrée : la limite est dépassée, le répertoire est parcouru
+    cache.put("r", 5, b"x" * 10_000)
+    assert len(scans) == 2
+    assert not cache.path("r", 0).exists()
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_unreadable_entry_is_recomputed_and_removed(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.put("r", "k", [1, 2])
+    path = cache.path("r", "k")
+    path.write_bytes(b"pas un pickle")
+    assert cache.get("r", "k", "absent") == "absent"
+    assert not path.exists()
+    assert cache.cached("r", "k", lambda: [3]) == [3]
+    assert cache.get("r", "k") == [3]
+
+
+def test_missing_entry_and_unwritable_directory(tmp_path):
+    assert DiskCache(tmp_path / "vide").get("r", "k", "absent") == "absent"
+    # Le répertoire est un fichier : rien n'est écrit, le calcul aboutit
+    blocked = tmp_path / "fichier"
+    blocked.write_text("")
+    cache = DiskCache(blocked)
+    assert cache.cached("r", "k", lambda: 42) == 42
+    assert cache.cached("r", "k", lambda: 43) == 43
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Leq glissant et niveaux statistiques par intervalle, comparés à un calcul
+direct fenêtre par fenêtre et à np.percentile.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics.indicators import LevelHistogram, interval_table, rolling_leq
+
+
+@pytest.fixture
+def laeq():
+    rng = np.random.default_rng(7)
+    times = pd.date_range("2024-05-01", periods=6 * 3600 // 10, freq="10s")
+    # Trou de 2 h (intervalles horaires sans ligne), puis une heure sans niveau
+    times = times[(times < "2024-05-01 02:00") | (times >= "2024-05-01 04:00")]
+    values = np.round(50 + 8 * rng.standard_normal(len(times)), 1)
+    series = pd.Series(values, index=times, name="LAeq")
+    series[rng.random(len(series)) < 0.05] = np.nan
+    series["2024-05-01 04:00":"2024-05-01 04:59:59"] = np.nan
+    return series
+
+
+def _naive_rolling(laeq, window):
+    times, values = laeq.index, laeq.to_numpy()
+    width = pd.Timedelta(window)
+    result = []
+    for t in times:
+        inside = values[(times > t - width) & (times <= t)]
+        inside = inside[~np.isnan(inside)]
+        result.append(10 * np.log10(np.mean(10 ** (inside / 10))) if len(inside) else np.nan)
+    return np.array(result)
+
+
+@pytest.mark.parametrize("window", ["15min", "1h"])
+def test_rolling_leq_matches_naive_windows(laeq, window):
+    result = rolling_leq(laeq, window)
+    assert result.name == f"Leq,{window}"
+    np.testing.assert_allclose(result.to_numpy(), _naive_rolling(laeq, window), rtol=0, atol=1e-9)
+    # Fenêtres sans aucun niveau (après le trou, dans l'heure sans niveau) : NaN
+    assert result["2024-05-01 04:00":"2024-05-01 04:59:59"].isna().all()
+
+
+def test_interval_table_matches_percentiles(laeq):
+    table = interval_table(laeq, "1h")
+    # Intervalles sans ligne absents du tableau
+    assert list(table.index.hour) == [0, 1, 4, 5]
+    for start, row in table.iterrows():
+        values = laeq[start:start + pd.Timedelta("1h") - pd.Timedelta("1ns")].dropna().to_numpy()
+        assert row["Nb mesures"] == len(values)
+        if not len(values):
+            assert row[["Leq", "L10", "L50", "L90"]].isna().all()
+            continue
+        assert row["Leq"] == pytest.approx(10 * np.log10(np.mean(10 ** (values / 10))), abs=1e-9)
+        for p in (10, 50, 90):
+            # Niveau dépassé pendant p % du temps : centile 100 - p
+            expected = np.percentile(values, 100 - p, method="inverted_cdf")
+            assert row[f"L{p}"] == pytest.approx(expected, abs=1e-9)
+
+
+def test_histogram_filled_by_chunks_matches_single_pass(laeq):
+    intervals = (laeq.index.hour.to_numpy() // 2)
+    single = LevelHistogram()
+    single.add(intervals, laeq.to_numpy())
+    chunked = LevelHistogram()
+    for part in np.array_split(np.arange(len(laeq)), 7):
+        chunked.add(intervals[part], laeq.to_numpy()[part])
+    for p in (10, 50, 90):
+        np.testing.assert_array_equal(chunked.exceeded(p), single.exceeded(p))
+
+
+def test_rolling_leq_all_nan():
+    series = pd.Series([np.nan, np.nan], index=pd.date_range("2024-01-01", periods=2, freq="s"))
+    assert rolling_leq(series, "1min").isna().all()
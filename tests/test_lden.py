@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Lden calculé par morceaux et sur le tableau complet en mémoire, comparé au
+calcul d'origine de page_3.py.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics.lden import lden_from_frame, lden_streaming
+
+
+@pytest.fixture
+def mesures():
+    rng = np.random.default_rng(4)
+    times = pd.date_range("2024-03-04 00:00", periods=2 * 24 * 60, freq="min")
+    laeq = 45 + 10 * np.sin(np.arange(len(times)) / 300) + rng.normal(0, 2, len(times))
+    df = pd.DataFrame({"Heure": times.strftime("%H:%M:%S"), "LAeq": laeq.round(1)})
+    df.loc[rng.random(len(df)) < 0.02, "LAeq"] = np.nan
+    return df
+
+
+def _reference_lden(df):
+    # Calcul d'origine de page_3.py : masques par période, puis moyenne énergétique
+    df = df.assign(Heure=pd.to_datetime(df["Heure"], format="%H:%M:%S").dt.hour)
+    laeq_jour = df[(df["Heure"] >= 7) & (df["Heure"] < 19)]["LAeq"]
+    laeq_soir = df[(df["Heure"] >= 19) & (df["Heure"] < 23)]["LAeq"]
+    laeq_nuit = pd.concat([df[df["Heure"] >= 23]["LAeq"], df[df["Heure"] < 7]["LAeq"]])
+    L_jour = 10 * np.log10(np.mean(10**(laeq_jour/10))) if not laeq_jour.empty else -np.inf
+    L_soir = 10 * np.log10(np.mean(10**(laeq_soir/10))) if not laeq_soir.empty else -np.inf
+    L_nuit = 10 * np.log10(np.mean(10**(laeq_nuit/10))) if not laeq_nuit.empty else -np.inf
+    num = 12 * 10**(L_jour/10) + 4 * 10**((L_soir+5)/10) + 8 * 10**((L_nuit+10)/10)
+    return {"Ljour": L_jour, "Lsoir": L_soir, "Lnuit": L_nuit, "Lden": 10 * np.log10(num / 24)}
+
+
+def _assert_same(result, expected):
+    assert result.keys() == expected.keys()
+    for key in expected:
+        assert result[key] == pytest.approx(expected[key], abs=1e-9)
+
+
+def test_in_memory_matches_original_page_formula(mesures):
+    _assert_same(lden_from_frame(mesures), _reference_lden(mesures))
+
+
+@pytest.mark.parametrize("chunksize", [1000, 100_000])
+def test_streaming_csv_matches_in_memory(tmp_path, mesures, chunksize):
+    path = tmp_path / "mesures.csv"
+    mesures.to_csv(path, index=False)
+    _assert_same(lden_streaming(path, chunksize=chunksize), lden_from_frame(mesures))
+
+
+def test_streaming_csv_with_date_times(tmp_path, mesures):
+    # Export CSV d'un sonomètre : dates-heures complètes dans la première colonne
+    times = pd.date_range("2024-03-04 00:00", periods=len(mesures), freq="min")
+    export = mesures.assign(Heure=times.strftime("%Y-%m-%d %H:%M:%S"))
+    path = tmp_path / "export.csv"
+    export.to_csv(path, index=False)
+    _assert_same(lden_streaming(path, chunksize=1000), _reference_lden(mesures))
+
+
+def test_streaming_xlsx_matches_in_memory(tmp_path, mesures):
+    path = tmp_path / "mesures.xlsx"
+    mesures.to_excel(path, index=False)
+    _assert_same(lden_streaming(path, chunksize=500), lden_from_frame(mesures))
+
+
+def test_streaming_parquet_matches_in_memory(tmp_path, mesures):
+    path = tmp_path / "mesures.parquet"
+    mesures.to_parquet(path, index=False, row_group_size=700)
+    _assert_same(lden_streaming(path, chunksize=500), lden_from_frame(mesures))
+
+
+def test_empty_period_is_minus_infinity():
+    df = pd.DataFrame({"Heure": ["08:00:00", "12:30:00"], "LAeq": [60.0, 60.0]})
+    result = lden_from_frame(df)
+    assert result["Ljour"] == pytest.approx(60)
+    assert result["Lsoir"] == -np.inf and result["Lnuit"] == -np.inf
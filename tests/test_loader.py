@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Fusion des fichiers d'une campagne de mesures (merge_measurements)."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics import loader
+from acoustics.loader import load_table, merge_measurements
+
+
+def _frame(start, periods, value, freq="s"):
+    index = pd.DatetimeIndex(pd.date_range(start, periods=periods, freq=freq), name="Start Time")
+    return pd.DataFrame({"LAeq": np.full(periods, value, dtype=np.float32)}, index=index)
+
+
+def test_contiguous_files_are_concatenated():
+    merged = merge_measurements([_frame("2024-01-01 00:01:00", 60, 2), _frame("2024-01-01 00:00:00", 60, 1)])
+    assert len(merged) == 120
+    assert merged.index.is_monotonic_increasing
+    assert merged["LAeq"].iloc[0] == 1 and merged["LAeq"].iloc[-1] == 2
+    assert merged.attrs["fusion"] == {"fichiers": 2, "mesures ignorées": 0, "interruptions": 0}
+
+
+def test_overlap_keeps_earliest_file():
+    first = _frame("2024-01-01 00:00:00", 120, 1)
+    second = _frame("2024-01-01 00:01:30", 120, 2)
+    merged = merge_measurements([second, first])
+    assert not merged.index.has_duplicates
+    assert len(merged) == 120 + 90
+    assert (merged.loc[:"2024-01-01 00:01:59", "LAeq"] == 1).all()
+    assert (merged.loc["2024-01-01 00:02:00":, "LAeq"] == 2).all()
+    assert merged.attrs["fusion"]["mesures ignorées"] == 30
+
+
+def test_file_inside_another_is_ignored():
+    merged = merge_measurements([_frame("2024-01-01", 600, 1), _frame("2024-01-01 00:02", 60, 2)])
+    assert len(merged) == 600
+    assert (merged["LAeq"] == 1).all()
+    assert merged.attrs["fusion"] == {"fichiers": 2, "mesures ignorées": 60, "interruptions": 0}
+
+
+def test_gap_inserts_nan_row():
+    merged = merge_measurements([_frame("2024-01-01 00:00", 60, 1), _frame("2024-01-02 00:00", 60, 2)])
+    assert len(merged) == 121
+    gap = merged.iloc[60]
+    assert gap.name == pd.Timestamp("2024-01-01 00:01:00")
+    assert np.isnan(gap["LAeq"])
+    assert merged["LAeq"].dtype == np.float32
+    assert merged.attrs["fusion"]["interruptions"] == 1
+
+
+def test_short_gap_is_not_interrupted():
+    # Écart de 2 pas de mesure, sous le seuil GAP_FACTOR
+    merged = merge_measurements([_frame("2024-01-01 00:00:00", 60, 1), _frame("2024-01-01 00:01:01", 60, 2)])
+    assert len(merged) == 120
+    assert merged.attrs["fusion"]["interruptions"] == 0
+
+
+def test_empty_files_are_skipped():
+    merged = merge_measurements([_frame("2024-01-01", 0, 1), _frame("2024-01-01", 10, 1)])
+    assert len(merged) == 10
+    assert merged.attrs["fusion"]["fichiers"] == 1
+
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_load_table_returns_independent_copies(monkeypatch, copy_on_write):
+    # Sans copie à l'écriture (pandas < 3), la copie retournée doit être complète
+    monkeypatch.setattr(loader, "_copy_on_write", lambda: copy_on_write)
+    upload = io.BytesIO(f"Start Time,LAeq\n2024-01-01 00:00:00,{40 + copy_on_write}\n".encode())
+    upload.name = "mesures.csv"
+    first = load_table(upload)
+    first.loc[0, "LAeq"] = 99.0
+    second = load_table(upload)
+    assert second.loc[0, "LAeq"] == 40 + copy_on_write
+    if not copy_on_write:
+        assert not np.shares_memory(second["LAeq"].to_numpy(), load_table(upload)["LAeq"].to_numpy())
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Tableaux conservés en fichiers NumPy et rouverts par projection en mémoire."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics import loader
+from acoustics.mapped import load_frame, mapped_bytes, save_frame
+
+
+@pytest.fixture
+def frame():
+    index = pd.DatetimeIndex(pd.date_range("2024-01-01", periods=1000, freq="s"), name="Start Time")
+    df = pd.DataFrame({"LAeq": np.linspace(30, 70, 1000, dtype=np.float32),
+                       "Wind Speed avg": np.full(1000, np.nan, dtype=np.float32)}, index=index)
+    df.attrs["fusion"] = {"fichiers": 2, "mesures ignorées": 3, "interruptions": 1}
+    return df
+
+
+def test_round_trip_is_mapped(tmp_path, frame):
+    save_frame(frame, tmp_path / "t.cols")
+    mapped = load_frame(tmp_path / "t.cols")
+    pd.testing.assert_frame_equal(mapped, frame, check_freq=False)
+    assert mapped.attrs == frame.attrs
+    # Index et colonnes lus dans les fichiers, sans copie
+    assert mapped_bytes(mapped) == frame.index.to_numpy().nbytes + 2 * 1000 * 4
+    assert mapped_bytes(frame) == 0
+
+
+def test_mapped_frame_is_read_only(tmp_path, frame):
+    save_frame(frame, tmp_path / "t.cols")
+    mapped = load_frame(tmp_path / "t.cols")
+    with pytest.raises(ValueError, match="read-only"):
+        mapped.loc[mapped.index[0], "LAeq"] = 99
+    # Une copie se modifie, le fichier reste intact
+    copy = mapped.copy()
+    copy.loc[copy.index[0], "LAeq"] = 99
+    assert load_frame(tmp_path / "t.cols")["LAeq"].iloc[0] == frame["LAeq"].iloc[0]
+
+
+def test_missing_or_incomplete_directory(tmp_path, frame):
+    assert load_frame(tmp_path / "absent.cols") is None
+    save_frame(frame, tmp_path / "t.cols")
+    (tmp_path / "t.cols" / "c0.npy").unlink()
+    assert load_frame(tmp_path / "t.cols") is None
+
+
+def test_existing_directory_is_kept(tmp_path, frame):
+    save_frame(frame, tmp_path / "t.cols")
+    save_frame(frame.iloc[:10], tmp_path / "t.cols")
+    assert len(load_frame(tmp_path / "t.cols")) == 1000
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_loader_builds_once_then_maps(tmp_path, monkeypatch, frame):
+    monkeypatch.setattr(loader, "mapped_path", lambda key: tmp_path / f"{key}.cols")
+    calls = []
+
+    def build():
+        calls.append(1)
+        return frame
+
+    first = loader._mapped(("cle",), build)
+    second = loader._mapped(("cle",), build)
+    assert len(calls) == 1
+    for df in (first, second):
+        pd.testing.assert_frame_equal(df, frame, check_freq=False)
+        assert mapped_bytes(df) > 0
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Table de la rose des vents, comparée au calcul de windrose (dépendance de
+test, voir requirements-dev.txt) et à une table calculée à la main.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from windrose.windrose import histogram
+
+from acoustics.rose import class_labels, rose_table, sector_labels
+
+
+@pytest.fixture
+def wind():
+    rng = np.random.default_rng(1)
+    n = 20_000
+    directions = (200 + rng.normal(0, 60, n)) % 360
+    # Directions exactement sur les limites de secteur
+    directions[:16] = np.arange(16) * 22.5 + 11.25
+    return directions, rng.gamma(2.0, 2.0, n)
+
+
+@pytest.mark.parametrize("nsector", [8, 16, 36])
+def test_rose_table_matches_windrose_histogram(wind, nsector):
+    directions, speeds = wind
+    bins = np.array([0.0, 2.0, 4.0, 6.0, 8.0, 10.0])
+    table = rose_table(directions, speeds, nsector=nsector, bins=bins)
+    _, _, expected = histogram(directions, speeds, bins, nsector, len(directions), normed=True)
+    np.testing.assert_allclose(table.to_numpy(), expected.T, rtol=1e-12)
+
+
+def test_rose_table_by_hand():
+    directions = np.array([0.0, 350.0, 10.0, 90.0, 100.0, 180.0, 270.0, np.nan, 45.0])
+    speeds = np.array([1.0, 3.0, 11.0, 5.0, 0.5, np.nan, 2.0, 4.0, 7.0])
+    table = rose_table(directions, speeds, nsector=4, bins=(0, 2, 10))
+    # Mesures sans direction ou sans vitesse écartées : 7 mesures valides ;
+    # 45° est à la limite des secteurs N et E, et compte dans E
+    expected = pd.DataFrame(
+        np.array([[1, 1, 1], [1, 2, 0], [0, 0, 0], [0, 1, 0]]) * 100 / 7,
+        index=pd.Index(["N", "E", "S", "O"], name="Secteur"),
+        columns=["[0 : 2) m/s", "[2 : 10) m/s", "≥ 10 m/s"],
+    )
+    pd.testing.assert_frame_equal(table, expected)
+
+
+def test_rose_table_units_and_lowest_class():
+    directions = np.array([0.0, 10.0, 90.0, 270.0, 180.0])
+    speeds = np.array([1.0, 3.0, 10.0, 0.5, 0.2])
+    table = rose_table(directions, speeds, nsector=4, bins=(1, 5, 10), unit="km/h")
+    # 0.2 m/s = 0.72 km/h, sous la première borne : écarté
+    assert table.to_numpy().sum() == pytest.approx(100)
+    assert table.loc["N"].tolist() == pytest.approx([25, 0, 25])
+    assert table.loc["E"].tolist() == pytest.approx([0, 0, 25])
+    assert table.loc["O"].tolist() == pytest.approx([25, 0, 0])
+
+
+def test_labels():
+    assert sector_labels(8) == ["N", "NE", "E", "SE", "S", "SO", "O", "NO"]
+    assert sector_labels(5)[1] == "72°"
+    assert class_labels((0, 5, 10), "km/h") == ["[0 : 5) km/h", "[5 : 10) km/h", "≥ 10 km/h"]
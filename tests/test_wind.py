@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Vecteurs de vent, comparés au calcul d'origine (boucle pd.Grouper)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from acoustics.wind import calculate_mean_direction_and_sigma_theta, compute_wind_vectors, direction_labels
+
+
+def _reference_vectors(df):
+    # Calcul d'origine de page5.py : un appel par intervalle de 5 minutes
+    results = []
+    for minute, group in df.groupby(pd.Grouper(key="Start Time", freq="5Min")):
+        mean_speed = group["Wind Speed avg"].mean()
+        mean_dir, sigma = calculate_mean_direction_and_sigma_theta(group["Wind Dir. avg"])
+        results.append([minute, mean_speed, mean_dir, sigma])
+    return pd.DataFrame(results, columns=["Start Time", "MeanWindSpeed", "MeanWindDirection", "SigmaTheta"])
+
+
+@pytest.fixture
+def wind():
+    rng = np.random.default_rng(1)
+    times = pd.date_range("2024-06-01", periods=3 * 3600, freq="s")
+    # Deux trous de 20 minutes : intervalles vides au milieu de la série
+    times = times[(times < "2024-06-01 00:40") | (times >= "2024-06-01 01:00")]
+    times = times[(times < "2024-06-01 02:10") | (times >= "2024-06-01 02:30")]
+    df = pd.DataFrame({
+        "Start Time": times,
+        "Wind Speed avg": rng.gamma(2.0, 2.0, len(times)),
+        "Wind Dir. avg": (200 + rng.normal(0, 40, len(times))) % 360,
+    })
+    # Directions manquantes éparses, et un intervalle sans aucune direction
+    df.loc[rng.random(len(df)) < 0.05, "Wind Dir. avg"] = np.nan
+    df.loc[df["Start Time"].between("2024-06-01 01:30", "2024-06-01 01:34:59"), "Wind Dir. avg"] = np.nan
+    return df
+
+
+def test_compute_wind_vectors_matches_grouper_loop(wind):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = _reference_vectors(wind)
+    pd.testing.assert_frame_equal(compute_wind_vectors(wind), expected, check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_compute_wind_vectors_from_index(wind):
+    by_column = compute_wind_vectors(wind)
+    by_index = compute_wind_vectors(wind.set_index("Start Time"))
+    pd.testing.assert_frame_equal(by_index, by_column)
+
+
+def test_compute_wind_vectors_freq(wind):
+    vectors = compute_wind_vectors(wind, freq="15Min")
+    assert len(vectors) == 12
+    assert vectors["Start Time"].diff().dropna().eq(pd.Timedelta("15Min")).all()
+
+
+def test_constant_direction_has_zero_sigma():
+    times = pd.date_range("2024-06-01", periods=600, freq="s")
+    df = pd.DataFrame({"Start Time": times, "Wind Speed avg": 3.0, "Wind Dir. avg": 90.0})
+    vectors = compute_wind_vectors(df)
+    sigma = vectors["SigmaTheta"].to_numpy()
+    assert (sigma == 0).all() and not np.signbit(sigma).any()
+    assert all(label.endswith("(0.0)") for label in direction_labels(vectors))